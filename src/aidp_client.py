@@ -6,15 +6,27 @@ Handles authentication, job submission, and result retrieval
 import asyncio
 import hashlib
 import os
+import random
 import time
-from typing import Any, Callable, Optional
-import json
+from typing import Any, AsyncIterator, Callable, Optional
+
+import orjson
 
 # AIDP Configuration
 AIDP_API_URL = os.getenv("AIDP_API_URL", "https://api.aidp.store")
 AIDP_API_KEY = os.getenv("AIDP_API_KEY", "")
 AIDP_WALLET = os.getenv("AIDP_WALLET", "")
 
+# Upload tuning
+UPLOAD_PART_SIZE = 64 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_PARALLEL_PARTS = 8
+
+# Download tuning
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_RANGE_PARTS = 8
+DOWNLOAD_RANGE_MIN_SIZE = 64 * 1024 * 1024  # smaller files use one stream
+
 
 class AIDPClient:
     """Client for interacting with AIDP decentralized GPU network"""
@@ -29,12 +41,38 @@ class AIDPClient:
         self.api_key = api_key
         self.wallet = wallet
         self._session = None
+        self._connector = None
+        # job_id -> (etag, last status body) for conditional polling
+        self._status_cache: dict[str, tuple[str, dict]] = {}
+        # (realpath, mtime_ns, size) -> uploaded LUT file_id
+        self._lut_cache: dict[tuple[str, int, int], str] = {}
+        self._lut_locks: dict[tuple[str, int, int], asyncio.Lock] = {}
+        # None until the job event stream has been tried
+        self._events_supported: Optional[bool] = None
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
 
     async def _get_session(self):
         """Get or create aiohttp session"""
         if self._session is None:
             import aiohttp
+            # One pooled, keep-alive connector for the client's lifetime so
+            # upload, polling and download reuse the same TLS connections
+            self._connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                keepalive_timeout=75,
+                ttl_dns_cache=300
+            )
             self._session = aiohttp.ClientSession(
+                connector=self._connector,
+                timeout=aiohttp.ClientTimeout(total=None, connect=10, sock_read=60),
+                json_serialize=_json_dumps,
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "X-AIDP-Wallet": self.wallet,
@@ -44,48 +82,122 @@ class AIDPClient:
         return self._session
 
     async def close(self):
-        """Close the session"""
+        """Close the session and its connection pool"""
         if self._session:
             await self._session.close()
             self._session = None
+            self._connector = None
+
+    async def _request_json(
+        self,
+        method: str,
+        path: str,
+        error: str,
+        **kwargs
+    ) -> Any:
+        """Issue a control-plane API call on the pooled session and decode the JSON reply"""
+        session = await self._get_session()
+
+        async with session.request(method, f"{self.api_url}{path}", **kwargs) as resp:
+            if resp.status != 200:
+                raise AIDPError(f"{error}: {await resp.text()}")
+            return orjson.loads(await resp.read())
 
-    async def upload_file(self, file_path: str) -> dict:
+    async def upload_file(self, file_path: str, file_hash: Optional[str] = None) -> dict:
         """
         Upload a file to AIDP decentralized storage
 
+        The file is streamed from disk in chunks. When the server hands out
+        presigned multipart URLs, parts are uploaded in parallel. The SHA256
+        integrity hash starts computing before the upload request. For a
+        multipart upload it overlaps the part uploads and is sent in the
+        completion request. A single PUT carries it as x-amz-meta-sha256,
+        so there it only overlaps the upload request and the PUT waits for it.
+
+        Args:
+            file_path: File to upload
+            file_hash: SHA256 of the file, if the caller already computed it
+
         Returns:
             dict with file_id and storage_url
         """
-        session = await self._get_session()
-
-        # Calculate file hash for integrity
-        file_hash = await self._hash_file(file_path)
         file_size = os.path.getsize(file_path)
         file_name = os.path.basename(file_path)
 
+        # Hashing is independent of the upload URL, so start it right away
+        if file_hash is None:
+            hash_task = asyncio.create_task(self.hash_file(file_path))
+        else:
+            hash_task = asyncio.get_running_loop().create_future()
+            hash_task.set_result(file_hash)
+        try:
+            return await self._upload_with_hash(
+                file_path, file_name, file_size, hash_task
+            )
+        finally:
+            if not hash_task.done():
+                hash_task.cancel()
+
+    async def _upload_with_hash(
+        self,
+        file_path: str,
+        file_name: str,
+        file_size: int,
+        hash_task: "asyncio.Future[str]"
+    ) -> dict:
+        """Request upload URL(s) and send the file while hash_task runs"""
         # Request upload URL
-        async with session.post(
-            f"{self.api_url}/v1/storage/upload",
+        upload_info = await self._request_json(
+            "POST", "/v1/storage/upload", "Upload request failed",
             json={
                 "filename": file_name,
                 "size": file_size,
-                "hash": file_hash,
-                "type": "video"
+                "type": "video",
+                "part_size": UPLOAD_PART_SIZE
             }
-        ) as resp:
-            if resp.status != 200:
-                raise AIDPError(f"Upload request failed: {await resp.text()}")
-            upload_info = await resp.json()
-
-        # Upload to presigned URL
-        with open(file_path, "rb") as f:
-            async with session.put(
-                upload_info["upload_url"],
-                data=f,
-                headers={"Content-Type": "video/mp4"}
-            ) as resp:
-                if resp.status not in (200, 201):
-                    raise AIDPError(f"File upload failed: {resp.status}")
+        )
+
+        # Upload to presigned URL(s)
+        parts = upload_info.get("parts")
+        if parts:
+            part_size = upload_info.get("part_size", UPLOAD_PART_SIZE)
+            expected_parts = -(-file_size // part_size)
+            if len(parts) != expected_parts:
+                raise AIDPError(
+                    f"Upload request returned {len(parts)} part URLs "
+                    f"for {expected_parts} parts"
+                )
+            semaphore = asyncio.Semaphore(MAX_PARALLEL_PARTS)
+
+            async def put_part(index: int, url: str) -> Optional[str]:
+                offset = index * part_size
+                async with semaphore:
+                    return await self._upload_part(
+                        url, file_path, offset, min(part_size, file_size - offset)
+                    )
+
+            etags = await asyncio.gather(
+                *(put_part(i, url) for i, url in enumerate(parts))
+            )
+            file_hash = await hash_task
+
+            await self._request_json(
+                "POST", f"/v1/storage/upload/{upload_info['file_id']}/complete",
+                "Upload completion failed",
+                json={
+                    "hash": file_hash,
+                    "parts": [
+                        {"part_number": i + 1, "etag": etag}
+                        for i, etag in enumerate(etags)
+                    ]
+                }
+            )
+        else:
+            file_hash = await hash_task
+            await self._upload_part(
+                upload_info["upload_url"], file_path, 0, file_size,
+                headers={"x-amz-meta-sha256": file_hash}
+            )
 
         return {
             "file_id": upload_info["file_id"],
@@ -93,6 +205,30 @@ class AIDPClient:
             "hash": file_hash
         }
 
+    async def _upload_part(
+        self,
+        url: str,
+        file_path: str,
+        offset: int,
+        size: int,
+        headers: Optional[dict] = None
+    ) -> Optional[str]:
+        """Stream one byte range of a file to a presigned URL, returning its ETag"""
+        session = await self._get_session()
+
+        async with session.put(
+            url,
+            data=_read_range(file_path, offset, size),
+            headers={
+                "Content-Type": "video/mp4",
+                "Content-Length": str(size),
+                **(headers or {})
+            }
+        ) as resp:
+            if resp.status not in (200, 201):
+                raise AIDPError(f"File upload failed: {resp.status}")
+            return resp.headers.get("ETag")
+
     async def submit_job(
         self,
         input_file_id: str,
@@ -114,13 +250,10 @@ class AIDPClient:
         Returns:
             dict with job_id and node_id
         """
-        session = await self._get_session()
-
         # Upload LUT if provided
         lut_file_id = None
         if lut_path:
-            lut_upload = await self.upload_file(lut_path)
-            lut_file_id = lut_upload["file_id"]
+            lut_file_id = await self._upload_lut(lut_path)
 
         # Build job configuration
         job_config = {
@@ -140,13 +273,10 @@ class AIDPClient:
             job_config["target_node"] = gpu_node
 
         # Submit job
-        async with session.post(
-            f"{self.api_url}/v1/jobs/submit",
+        result = await self._request_json(
+            "POST", "/v1/jobs/submit", "Job submission failed",
             json=job_config
-        ) as resp:
-            if resp.status != 200:
-                raise AIDPError(f"Job submission failed: {await resp.text()}")
-            result = await resp.json()
+        )
 
         return {
             "job_id": result["job_id"],
@@ -155,36 +285,166 @@ class AIDPClient:
             "cost_estimate": result.get("cost_estimate_usd")
         }
 
+    async def _upload_lut(self, lut_path: str) -> str:
+        """
+        Upload a LUT file and return its file_id
+
+        Uploads are cached per client, keyed by real path, mtime and size,
+        so a batch sharing one LUT uploads (and hashes) it only once.
+        """
+        stat = os.stat(lut_path)
+        key = (os.path.realpath(lut_path), stat.st_mtime_ns, stat.st_size)
+
+        async with self._lut_locks.setdefault(key, asyncio.Lock()):
+            if key not in self._lut_cache:
+                lut_upload = await self.upload_file(lut_path)
+                self._lut_cache[key] = lut_upload["file_id"]
+            return self._lut_cache[key]
+
     async def get_job_status(self, job_id: str) -> dict:
-        """Get current status of a job"""
+        """
+        Get current status of a job
+
+        Revalidates against the last ETag seen for the job, so an unchanged
+        status comes back as a 304 and the cached body is reused.
+        """
         session = await self._get_session()
+        cached = self._status_cache.get(job_id)
+        headers = {"If-None-Match": cached[0]} if cached else None
 
-        async with session.get(f"{self.api_url}/v1/jobs/{job_id}") as resp:
+        async with session.get(
+            f"{self.api_url}/v1/jobs/{job_id}",
+            headers=headers
+        ) as resp:
+            if resp.status == 304 and cached:
+                return cached[1]
+            if resp.status in (404, 410):
+                # Unknown or expired job; it will never complete
+                raise AIDPJobFailed(f"Job not found: {await resp.text()}")
             if resp.status != 200:
                 raise AIDPError(f"Status check failed: {await resp.text()}")
-            return await resp.json()
+            status = orjson.loads(await resp.read())
+            etag = resp.headers.get("ETag")
+
+        if etag and status.get("status") not in ("completed", "failed"):
+            self._status_cache[job_id] = (etag, status)
+        else:
+            self._status_cache.pop(job_id, None)
+
+        return status
+
+    async def stream_job(self, job_id: str) -> AsyncIterator[dict]:
+        """
+        Stream status events pushed by AIDP for a job
+
+        Yields each status update as it arrives over the job's websocket
+        until the server closes the stream.
+        """
+        import aiohttp
+
+        session = await self._get_session()
+
+        async with session.ws_connect(
+            f"{self.api_url}/v1/jobs/{job_id}/ws",
+            heartbeat=30
+        ) as ws:
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    yield orjson.loads(msg.data)
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    raise AIDPError(f"Job event stream failed: {ws.exception()}")
 
     async def wait_for_job(
         self,
         job_id: str,
         timeout: int = 3600,
-        poll_interval: int = 2,
-        progress_callback: Optional[Callable] = None
+        poll_interval: float = 2,
+        progress_callback: Optional[Callable] = None,
+        max_poll_interval: float = 30
     ) -> dict:
         """
         Wait for a job to complete
 
+        Subscribes to the job's event stream so completion is seen as soon
+        as the server reports it. If the stream is unavailable or drops
+        before the job finishes, falls back to polling: starting at
+        poll_interval and backing off exponentially (with jitter) up to
+        max_poll_interval. A server-provided next_poll_after_seconds hint
+        takes precedence.
+
         Args:
             job_id: Job ID to wait for
             timeout: Maximum wait time in seconds
-            poll_interval: Seconds between status checks
+            poll_interval: Initial seconds between status checks
             progress_callback: Optional callback for progress updates
+            max_poll_interval: Upper bound for the backoff interval
 
         Returns:
             Final job status with output_file_id
         """
         start_time = time.time()
 
+        if self._events_supported is not False:
+            try:
+                status = await asyncio.wait_for(
+                    self._wait_for_job_events(job_id, progress_callback),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                raise AIDPError(f"Job timed out after {timeout} seconds")
+            if status is not None:
+                return status
+
+        return await self._poll_job(
+            job_id,
+            start_time=start_time,
+            timeout=timeout,
+            poll_interval=poll_interval,
+            progress_callback=progress_callback,
+            max_poll_interval=max_poll_interval
+        )
+
+    async def _wait_for_job_events(
+        self,
+        job_id: str,
+        progress_callback: Optional[Callable] = None
+    ) -> Optional[dict]:
+        """Wait on the job event stream; None means fall back to polling"""
+        import aiohttp
+
+        try:
+            async for status in self.stream_job(job_id):
+                self._events_supported = True
+
+                if progress_callback:
+                    progress_callback(status)
+
+                if status.get("status") == "completed":
+                    return status
+
+                if status.get("status") == "failed":
+                    raise AIDPJobFailed(f"Job failed: {status.get('error', 'Unknown error')}")
+        except aiohttp.WSServerHandshakeError as e:
+            if e.status == 404:
+                # Server has no event endpoint; don't retry it for later jobs
+                self._events_supported = False
+        except aiohttp.ClientError:
+            pass
+
+        return None
+
+    async def _poll_job(
+        self,
+        job_id: str,
+        start_time: float,
+        timeout: float,
+        poll_interval: float,
+        progress_callback: Optional[Callable],
+        max_poll_interval: float
+    ) -> dict:
+        """Poll job status with exponential backoff until it finishes"""
+        interval = poll_interval
+
         while True:
             status = await self.get_job_status(job_id)
 
@@ -195,70 +455,150 @@ class AIDPClient:
                 return status
 
             if status["status"] == "failed":
-                raise AIDPError(f"Job failed: {status.get('error', 'Unknown error')}")
+                raise AIDPJobFailed(f"Job failed: {status.get('error', 'Unknown error')}")
 
-            if time.time() - start_time > timeout:
+            elapsed = time.time() - start_time
+            if elapsed > timeout:
                 raise AIDPError(f"Job timed out after {timeout} seconds")
 
-            await asyncio.sleep(poll_interval)
+            delay = status.get("next_poll_after_seconds") or interval
+            await asyncio.sleep(min(delay, timeout - elapsed))
+            interval = min(interval * 1.5, max_poll_interval) + random.uniform(0, 0.5)
 
     async def download_file(self, file_id: str, output_path: str) -> str:
-        """Download a file from AIDP storage"""
-        session = await self._get_session()
+        """
+        Download a file from AIDP storage, streaming it to disk
 
+        Large files on servers that accept byte ranges are fetched with
+        DOWNLOAD_RANGE_PARTS parallel Range requests; anything else falls
+        back to a single stream.
+        """
         # Get download URL
-        async with session.get(
-            f"{self.api_url}/v1/storage/download/{file_id}"
-        ) as resp:
-            if resp.status != 200:
-                raise AIDPError(f"Download request failed: {await resp.text()}")
-            download_info = await resp.json()
+        download_info = await self._request_json(
+            "GET", f"/v1/storage/download/{file_id}", "Download request failed"
+        )
+        url = download_info["download_url"]
+
+        size = await self._ranged_download_size(url)
+        if size:
+            try:
+                await self._download_ranges(url, output_path, size)
+                return output_path
+            except _RangeNotSupported:
+                pass
+
+        await self._download_stream(url, output_path)
+        return output_path
+
+    async def _ranged_download_size(self, url: str) -> Optional[int]:
+        """
+        Return the file size if it is worth fetching url in parallel ranges
+
+        Probes with a one-byte ranged GET rather than HEAD: presigned URLs
+        are signed for a single method, so a HEAD on a GET URL is rejected.
+        Any failure means the caller downloads a single stream instead.
+        """
+        import aiohttp
+
+        session = await self._get_session()
+
+        try:
+            async with session.get(url, headers={"Range": "bytes=0-0"}) as resp:
+                if resp.status != 206:
+                    return None
+                # "bytes 0-0/<size>"; the size may be "*" if unknown
+                total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+                await resp.read()
+        except aiohttp.ClientError:
+            return None
+
+        if not total.isdigit() or int(total) < DOWNLOAD_RANGE_MIN_SIZE:
+            return None
+        return int(total)
+
+    async def _download_ranges(self, url: str, output_path: str, size: int):
+        """Fetch url as parallel byte ranges written into a preallocated file"""
+        import aiofiles
+
+        async with aiofiles.open(output_path, "wb") as f:
+            await _preallocate(f.fileno(), size)
+            await f.truncate(size)
+
+        span = -(-size // DOWNLOAD_RANGE_PARTS)
+        tasks = [
+            asyncio.create_task(
+                self._fetch_range(url, output_path, start, min(start + span, size) - 1)
+            )
+            for start in range(0, size, span)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _fetch_range(self, url: str, output_path: str, start: int, end: int):
+        """Download bytes start..end (inclusive) of url into the same offsets of output_path"""
+        import aiofiles
+
+        session = await self._get_session()
+
+        async with session.get(url, headers={"Range": f"bytes={start}-{end}"}) as resp:
+            if resp.status != 206:
+                raise _RangeNotSupported(f"Range request returned {resp.status}")
+
+            async with aiofiles.open(output_path, "r+b") as f:
+                await f.seek(start)
+                async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
+
+    async def _download_stream(self, url: str, output_path: str):
+        """Download url as a single stream"""
+        import aiofiles
 
-        # Download file
-        async with session.get(download_info["download_url"]) as resp:
+        session = await self._get_session()
+
+        async with session.get(url) as resp:
             if resp.status != 200:
                 raise AIDPError(f"File download failed: {resp.status}")
 
-            with open(output_path, "wb") as f:
-                async for chunk in resp.content.iter_chunked(8192):
-                    f.write(chunk)
-
-        return output_path
+            async with aiofiles.open(output_path, "wb") as f:
+                if resp.content_length:
+                    await _preallocate(f.fileno(), resp.content_length)
+                async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
 
     async def list_gpu_nodes(self, available_only: bool = True) -> list:
         """List available GPU nodes on AIDP network"""
-        session = await self._get_session()
-
         params = {"available_only": str(available_only).lower()}
 
-        async with session.get(
-            f"{self.api_url}/v1/nodes",
-            params=params
-        ) as resp:
-            if resp.status != 200:
-                raise AIDPError(f"Node list failed: {await resp.text()}")
-            return await resp.json()
+        return await self._request_json(
+            "GET", "/v1/nodes", "Node list failed", params=params
+        )
 
     async def get_pricing(self, gpu_type: str = "any") -> dict:
         """Get current pricing for GPU compute"""
-        session = await self._get_session()
-
-        async with session.get(
-            f"{self.api_url}/v1/pricing",
+        return await self._request_json(
+            "GET", "/v1/pricing", "Pricing request failed",
             params={"gpu_type": gpu_type}
-        ) as resp:
-            if resp.status != 200:
-                raise AIDPError(f"Pricing request failed: {await resp.text()}")
-            return await resp.json()
+        )
 
     @staticmethod
-    async def _hash_file(file_path: str, chunk_size: int = 65536) -> str:
-        """Calculate SHA256 hash of file"""
-        sha256 = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            while chunk := f.read(chunk_size):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+    async def hash_file(file_path: str, chunk_size: int = 4 * 1024 * 1024) -> str:
+        """Calculate SHA256 hash of file in a worker thread"""
+        def digest() -> str:
+            with open(file_path, "rb") as f:
+                if hasattr(hashlib, "file_digest"):
+                    # Python 3.11+: read + hash loop runs in C without the GIL
+                    return hashlib.file_digest(f, "sha256").hexdigest()
+                sha256 = hashlib.sha256()
+                while chunk := f.read(chunk_size):
+                    sha256.update(chunk)
+                return sha256.hexdigest()
+
+        return await asyncio.get_running_loop().run_in_executor(None, digest)
 
 
 class AIDPError(Exception):
@@ -266,6 +606,61 @@ class AIDPError(Exception):
     pass
 
 
+class AIDPJobFailed(AIDPError):
+    """Job failed on AIDP, or is unknown or expired, and will never complete"""
+    pass
+
+
+class _RangeNotSupported(AIDPError):
+    """Storage ignored a Range request; download as a single stream instead"""
+    pass
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize request bodies with orjson (aiohttp expects str)"""
+    return orjson.dumps(obj).decode()
+
+
+async def _preallocate(fd: int, size: int):
+    """
+    Reserve disk space for a download up front to avoid fragmentation
+
+    Runs in a worker thread: on filesystems without native fallocate,
+    glibc emulates it by writing every block of the file.
+    """
+    if not hasattr(os, "posix_fallocate"):
+        return
+
+    def fallocate():
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except OSError:
+            # Not supported by every filesystem; the write path still works
+            pass
+
+    await asyncio.get_running_loop().run_in_executor(None, fallocate)
+
+
+async def _read_range(
+    file_path: str,
+    offset: int,
+    size: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Yield a byte range of a file in chunks without blocking the event loop"""
+    import aiofiles
+
+    async with aiofiles.open(file_path, "rb") as f:
+        await f.seek(offset)
+        remaining = size
+        while remaining > 0:
+            chunk = await f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
 # Convenience functions for direct usage
 async def process_video_on_aidp(
     input_path: str,
@@ -283,9 +678,7 @@ async def process_video_on_aidp(
             preset={"encoder": "h264_nvenc", "crf": 23}
         )
     """
-    client = AIDPClient()
-
-    try:
+    async with AIDPClient() as client:
         # Upload
         upload_result = await client.upload_file(input_path)
 
@@ -308,6 +701,3 @@ async def process_video_on_aidp(
             "job_id": job["job_id"],
             "metrics": result.get("metrics", {})
         }
-
-    finally:
-        await client.close()
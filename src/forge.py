@@ -6,14 +6,22 @@ Main entry point for submitting video processing jobs to AIDP network
 
 import argparse
 import asyncio
-import json
+import os
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
-from aidp_client import AIDPClient
+import orjson
+
+from aidp_client import AIDPClient, AIDPJobFailed
 from gpu_pipeline import GPUPipeline
-from presets import PRESETS
+from presets import LUTS_DIR, PRESETS, compiled_preset, preferred_lut_path
+from state import STATE_DB_NAME, JobStore
+
+
+# --lut value that selects the preset's preferred LUT
+PREFERRED_LUT = "preferred"
+LUT_HELP = f"Custom LUT file (.cube), or '{PREFERRED_LUT}' for the preset's own LUT"
 
 
 def parse_args():
@@ -25,9 +33,15 @@ Examples:
   # Process single video with cinematic preset
   forge process --input video.mp4 --preset cinematic --output result.mp4
 
+  # Use the preset's own LUT (from $AIDP_LUTS_DIR)
+  forge process --input video.mp4 --preset cinematic --lut preferred
+
   # Batch process folder with custom LUT
   forge batch --input ./videos --lut Teal_Orange.cube --output ./processed
 
+  # Resume an interrupted batch
+  forge resume --input ./videos --lut Teal_Orange.cube --output ./processed
+
   # Check job status
   forge status --job-id abc123
         """
@@ -41,20 +55,24 @@ Examples:
     process_parser.add_argument("--output", "-o", help="Output file path")
     process_parser.add_argument("--preset", "-p", choices=list(PRESETS.keys()),
                                 default="default", help="Processing preset")
-    process_parser.add_argument("--lut", help="Custom LUT file (.cube)")
+    process_parser.add_argument("--lut", help=LUT_HELP)
     process_parser.add_argument("--gpu-node", help="Specific AIDP GPU node to use")
     process_parser.add_argument("--local", action="store_true",
                                 help="Process locally (no AIDP)")
 
-    # Batch command
+    # Batch and resume commands
     batch_parser = subparsers.add_parser("batch", help="Batch process videos")
-    batch_parser.add_argument("--input", "-i", required=True, help="Input directory")
-    batch_parser.add_argument("--output", "-o", help="Output directory")
-    batch_parser.add_argument("--preset", "-p", choices=list(PRESETS.keys()),
-                              default="default", help="Processing preset")
-    batch_parser.add_argument("--lut", help="Custom LUT file (.cube)")
-    batch_parser.add_argument("--parallel", type=int, default=4,
-                              help="Number of parallel jobs on AIDP")
+    resume_parser = subparsers.add_parser(
+        "resume", help="Resume an interrupted batch, skipping finished videos"
+    )
+    for sub_parser in (batch_parser, resume_parser):
+        sub_parser.add_argument("--input", "-i", required=True, help="Input directory")
+        sub_parser.add_argument("--output", "-o", help="Output directory")
+        sub_parser.add_argument("--preset", "-p", choices=list(PRESETS.keys()),
+                                default="default", help="Processing preset")
+        sub_parser.add_argument("--lut", help=LUT_HELP)
+        sub_parser.add_argument("--parallel", type=int, default=4,
+                                help="Number of parallel jobs on AIDP")
 
     # Status command
     status_parser = subparsers.add_parser("status", help="Check job status")
@@ -68,6 +86,21 @@ Examples:
     return parser.parse_args()
 
 
+def resolve_lut(lut: Optional[str], preset: dict) -> Optional[str]:
+    """Resolve a --lut value, mapping 'preferred' to the preset's own LUT"""
+    if lut == PREFERRED_LUT:
+        return preferred_lut_path(preset)
+    return lut
+
+
+def lut_key(lut_path: Optional[str]) -> Optional[str]:
+    """Identify a LUT file by real path, mtime and size, for resume checks"""
+    if not lut_path:
+        return None
+    stat = os.stat(lut_path)
+    return f"{os.path.realpath(lut_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
 async def process_video(args):
     """Process a single video file"""
     input_path = Path(args.input)
@@ -78,14 +111,21 @@ async def process_video(args):
 
     output_path = args.output or str(input_path.stem) + "_processed.mp4"
     preset = PRESETS.get(args.preset, PRESETS["default"])
+    lut_path = resolve_lut(args.lut, preset)
+    if args.lut and not lut_path:
+        print(f"Error: Preset {args.preset} has no preferred LUT")
+        return 1
+    if lut_path and not os.path.exists(lut_path):
+        print(f"Error: LUT file not found: {lut_path}")
+        return 1
 
     print(f"AIDP Video Forge")
     print("=" * 50)
     print(f"Input:  {input_path}")
     print(f"Output: {output_path}")
     print(f"Preset: {args.preset}")
-    if args.lut:
-        print(f"LUT:    {args.lut}")
+    if lut_path:
+        print(f"LUT:    {lut_path}")
     print("=" * 50)
 
     if args.local:
@@ -95,31 +135,30 @@ async def process_video(args):
             input_path=str(input_path),
             output_path=output_path,
             preset=preset,
-            lut_path=args.lut
+            lut_path=lut_path
         )
     else:
         # AIDP processing
-        client = AIDPClient()
+        async with AIDPClient() as client:
+            print("\n[1/4] Uploading to AIDP network...")
+            upload_result = await client.upload_file(str(input_path))
 
-        print("\n[1/4] Uploading to AIDP network...")
-        upload_result = await client.upload_file(str(input_path))
+            print("[2/4] Submitting GPU job...")
+            job = await client.submit_job(
+                input_file_id=upload_result["file_id"],
+                preset=preset,
+                lut_path=lut_path,
+                gpu_node=args.gpu_node
+            )
 
-        print("[2/4] Submitting GPU job...")
-        job = await client.submit_job(
-            input_file_id=upload_result["file_id"],
-            preset=preset,
-            lut_path=args.lut,
-            gpu_node=args.gpu_node
-        )
+            print(f"[3/4] Processing on AIDP GPU node: {job['node_id']}")
+            print(f"      Job ID: {job['job_id']}")
 
-        print(f"[3/4] Processing on AIDP GPU node: {job['node_id']}")
-        print(f"      Job ID: {job['job_id']}")
+            # Wait for completion
+            result = await client.wait_for_job(job["job_id"], progress_callback=print_progress)
 
-        # Wait for completion
-        result = await client.wait_for_job(job["job_id"], progress_callback=print_progress)
-
-        print("[4/4] Downloading result...")
-        await client.download_file(result["output_file_id"], output_path)
+            print("[4/4] Downloading result...")
+            await client.download_file(result["output_file_id"], output_path)
 
     print("\n" + "=" * 50)
     print("Processing complete!")
@@ -136,21 +175,56 @@ async def process_video(args):
     return 0
 
 
-async def batch_process(args):
-    """Batch process multiple videos"""
+VIDEO_EXTENSIONS = frozenset({".mp4", ".mov", ".mkv", ".avi", ".m4v", ".webm"})
+
+
+def find_videos(directory: Path) -> Iterator[Path]:
+    """
+    Yield video files in a directory
+
+    Uses os.scandir so file type checks come from the directory entry
+    itself rather than a stat() per file.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if (os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS
+                    and entry.is_file()):
+                yield Path(entry.path)
+
+
+async def batch_process(args, resume: bool = False):
+    """
+    Batch process multiple videos
+
+    Progress is recorded in a state database in the output directory.
+    Inputs already stored on AIDP are never uploaded twice, and with
+    resume=True finished videos are skipped and in-flight jobs are
+    picked up again instead of being resubmitted. A video is only
+    resumed if its preset, LUT and output match the recorded job, and
+    its job is only resubmitted if it failed or expired on AIDP.
+    """
     input_dir = Path(args.input)
 
     if not input_dir.is_dir():
         print(f"Error: Input directory not found: {input_dir}")
         return 1
 
+    preset = PRESETS.get(args.preset, PRESETS["default"])
+    lut_path = resolve_lut(args.lut, preset)
+    if args.lut and not lut_path:
+        print(f"Error: Preset {args.preset} has no preferred LUT")
+        return 1
+    if lut_path and not os.path.exists(lut_path):
+        print(f"Error: LUT file not found: {lut_path}")
+        return 1
+
+    lut = lut_key(lut_path)
+
     output_dir = Path(args.output or str(input_dir) + "_processed")
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Find video files
-    video_extensions = {".mp4", ".mov", ".mkv", ".avi", ".m4v", ".webm"}
-    videos = [f for f in input_dir.iterdir()
-              if f.suffix.lower() in video_extensions]
+    videos = list(find_videos(input_dir))
 
     if not videos:
         print(f"No video files found in {input_dir}")
@@ -165,52 +239,95 @@ async def batch_process(args):
     print(f"Parallel: {args.parallel} jobs")
     print("=" * 50)
 
-    client = AIDPClient()
-    preset = PRESETS.get(args.preset, PRESETS["default"])
-
-    # Submit all jobs
-    jobs = []
-    for i, video in enumerate(videos):
-        print(f"\n[{i+1}/{len(videos)}] Submitting: {video.name}")
-
-        upload_result = await client.upload_file(str(video))
-        job = await client.submit_job(
-            input_file_id=upload_result["file_id"],
-            preset=preset,
-            lut_path=args.lut
-        )
-        jobs.append({
-            "job_id": job["job_id"],
-            "input": video.name,
-            "output": str(output_dir / f"{video.stem}_processed.mp4")
-        })
-
-    print(f"\nSubmitted {len(jobs)} jobs to AIDP network")
-    print("Waiting for completion...")
-
-    # Wait for all jobs
-    completed = 0
-    for job in jobs:
-        result = await client.wait_for_job(job["job_id"])
-        await client.download_file(result["output_file_id"], job["output"])
-        completed += 1
-        print(f"Completed: {completed}/{len(jobs)} - {job['input']}")
+    with JobStore(str(output_dir / STATE_DB_NAME)) as store:
+        async with AIDPClient() as client:
+            # Each video runs upload -> submit -> wait -> download on its own, so
+            # uploads of later videos overlap with processing of earlier ones
+            semaphore = asyncio.Semaphore(args.parallel)
+            completed = 0
+
+            async def process_one(video: Path):
+                nonlocal completed
+                output = str(output_dir / f"{video.stem}_processed.mp4")
+
+                async with semaphore:
+                    file_hash = await client.hash_file(str(video))
+                    record = store.get(file_hash)
+                    same_job = (
+                        resume and record is not None
+                        and record["output"] == output
+                        and record["preset"] == args.preset
+                        and record["lut"] == lut
+                    )
+
+                    if same_job and record["status"] == "completed" and os.path.exists(output):
+                        print(f"Skipping: {video.name} (already processed)")
+                    else:
+                        result = None
+                        if same_job and record["status"] == "submitted":
+                            print(f"Resuming: {video.name} (job {record['job_id']})")
+                            try:
+                                result = await client.wait_for_job(record["job_id"])
+                            except AIDPJobFailed as e:
+                                # The job failed or expired on AIDP, so waiting on
+                                # it again can never succeed; clear it and resubmit.
+                                # Other errors propagate and leave it to resume later,
+                                # since the job may still be running.
+                                print(f"Resubmitting: {video.name} ({e})")
+                                store.record_upload(file_hash, record["file_id"])
+
+                        if result is None:
+                            print(f"Submitting: {video.name}")
+                            if record and record["file_id"]:
+                                file_id = record["file_id"]
+                            else:
+                                upload_result = await client.upload_file(
+                                    str(video), file_hash=file_hash
+                                )
+                                file_id = upload_result["file_id"]
+                                store.record_upload(file_hash, file_id)
+
+                            job = await client.submit_job(
+                                input_file_id=file_id,
+                                preset=preset,
+                                lut_path=lut_path
+                            )
+                            store.record_job(
+                                file_hash, job["job_id"], args.preset, output, lut
+                            )
+                            result = await client.wait_for_job(job["job_id"])
+
+                        await client.download_file(result["output_file_id"], output)
+                        store.mark_completed(file_hash)
+
+                completed += 1
+                print(f"Completed: {completed}/{len(videos)} - {video.name}")
+
+            results = await asyncio.gather(
+                *(process_one(video) for video in videos),
+                return_exceptions=True
+            )
+
+    failed = [(video, err) for video, err in zip(videos, results)
+              if isinstance(err, Exception)]
+    for video, err in failed:
+        print(f"Failed: {video.name} - {err}")
 
     print("\n" + "=" * 50)
     print(f"Batch processing complete!")
     print(f"Output directory: {output_dir}")
 
-    return 0
+    return 1 if failed else 0
 
 
 async def check_status(args):
     """Check job status"""
-    client = AIDPClient()
-    status = await client.get_job_status(args.job_id)
+    async with AIDPClient() as client:
+        status = await client.get_job_status(args.job_id)
 
     print(f"Job Status: {args.job_id}")
     print("=" * 50)
-    print(json.dumps(status, indent=2))
+    print(orjson.dumps(status, option=orjson.OPT_INDENT_2).decode())
 
     return 0
 
@@ -223,14 +340,16 @@ def list_resources(args):
         for name, preset in PRESETS.items():
             print(f"\n{name}:")
             print(f"  {preset.get('description', 'No description')}")
+            resolution = compiled_preset(preset).scale_x_str
+            if resolution:
+                print(f"  Resolution: {resolution}")
 
     elif args.type == "luts":
-        lut_dir = Path(__file__).parent.parent.parent / "ColorGrading" / "LUTs"
-        if lut_dir.exists():
+        if LUTS_DIR.exists():
             print("Available LUTs:")
             print("=" * 50)
-            for lut in lut_dir.rglob("*.cube"):
-                print(f"  {lut.relative_to(lut_dir)}")
+            for lut in LUTS_DIR.rglob("*.cube"):
+                print(f"  {lut.relative_to(LUTS_DIR)}")
         else:
             print("LUT directory not found")
 
@@ -261,6 +380,8 @@ async def main():
         return await process_video(args)
     elif args.command == "batch":
         return await batch_process(args)
+    elif args.command == "resume":
+        return await batch_process(args, resume=True)
     elif args.command == "status":
         return await check_status(args)
     elif args.command == "list":
@@ -4,11 +4,153 @@ Builds FFmpeg command chains optimized for NVIDIA GPUs
 """
 
 import asyncio
+import collections
+import functools
 import json
 import os
+import re
 import subprocess
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
+
+import presets
+from presets import (
+    NVENC_PRESETS,
+    PRESETS,
+    QUALITY_SPEEDS,
+    _compile_filter_chain,
+    _compile_output_args,
+    compiled_preset,
+    cpu_fallback,
+    encoder_family,
+    is_runnable,
+)
+
+
+# Placeholders for the input and output paths in compiled argv templates
+_INPUT = "{I}"
+_OUTPUT = "{O}"
+
+# "Duration: 00:01:23.45" line that ffmpeg logs for each input
+_DURATION_RE = re.compile(r"Duration:\s+(\d+):(\d+):([\d.]+)")
+
+
+def _parse_duration(log: str) -> Optional[float]:
+    """Extract the input duration in seconds from ffmpeg log output"""
+    match = _DURATION_RE.search(log)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+async def _drain_log(
+    stream: asyncio.StreamReader,
+    tail_lines: int = 50
+) -> tuple[str, Optional[float]]:
+    """
+    Consume ffmpeg's stderr so the pipe never fills and stalls the encode
+
+    Returns:
+        (last tail_lines of the log, input duration if it was logged)
+    """
+    tail = collections.deque(maxlen=tail_lines)
+    duration = None
+    async for raw in stream:
+        line = raw.decode(errors="replace").rstrip()
+        if duration is None:
+            duration = _parse_duration(line)
+        tail.append(line)
+    return "\n".join(tail), duration
+
+
+@functools.lru_cache(maxsize=64)
+def _filter_chain(
+    preset_name: str,
+    lut_path: Optional[str],
+    use_cuda: bool,
+    use_libplacebo: bool
+) -> str:
+    """
+    Build the FFmpeg filter chain for a registered preset
+
+    Memoised, so a batch that reuses one preset and LUT builds it once.
+    """
+    return _compile_filter_chain(
+        PRESETS[preset_name], lut_path, use_cuda, use_libplacebo
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _specialize_argv(template: tuple[str, ...]) -> Callable[[str, str], list[str]]:
+    """
+    Generate a function returning the argv template with the paths filled in
+
+    The generated function is a single list literal with the input and
+    output paths at their positions, so building a command runs no
+    Python-level loop or branches. Identical templates share a function.
+    """
+    items = ", ".join(
+        "input_path" if arg == _INPUT else "output_path" if arg == _OUTPUT else repr(arg)
+        for arg in template
+    )
+    source = f"def build(input_path, output_path):\n    return [{items}]\n"
+    namespace: dict[str, Any] = {}
+    exec(compile(source, "<ffmpeg argv>", "exec"), namespace)
+    return namespace["build"]
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_ffmpeg(ffmpeg_path: str) -> tuple[bool, bool, bool]:
+    """
+    Check an FFmpeg binary for NVENC encoding, CUDA filters and libplacebo
+
+    libplacebo only counts if a Vulkan device can be derived from the CUDA
+    device, which headless CUDA-only nodes often can't do. Cached per
+    binary, so the probe runs at most once per process.
+
+    Returns:
+        (has_nvenc, has_cuda, has_libplacebo)
+    """
+    try:
+        # Query encoders and filters concurrently rather than back to back
+        encoders = subprocess.Popen(
+            [ffmpeg_path, "-hide_banner", "-encoders"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+        filters = subprocess.Popen(
+            [ffmpeg_path, "-hide_banner", "-filters"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+        has_nvenc = "h264_nvenc" in encoders.communicate()[0]
+        filter_list = filters.communicate()[0]
+        has_cuda = "scale_cuda" in filter_list
+        has_libplacebo = (
+            has_cuda and "libplacebo" in filter_list and _probe_vulkan(ffmpeg_path)
+        )
+        return has_nvenc, has_cuda, has_libplacebo
+    except Exception:
+        return False, False, False
+
+
+def _probe_vulkan(ffmpeg_path: str) -> bool:
+    """Check FFmpeg can derive a Vulkan device from the CUDA device"""
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, "-hide_banner", "-v", "error",
+             "-init_hw_device", "cuda=cu", "-init_hw_device", "vulkan=vk@cu",
+             "-f", "lavfi", "-i", "nullsrc=s=16x16:d=0.04", "-f", "null", "-"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return result.returncode == 0
 
 
 class GPUPipeline:
@@ -31,36 +173,25 @@ class GPUPipeline:
     }
 
     # NVENC presets (quality/speed tradeoff)
-    NVENC_PRESETS = {
-        "fastest": "p1",
-        "fast": "p2",
-        "medium": "p4",
-        "slow": "p5",
-        "quality": "p6",
-        "best": "p7",
-    }
+    NVENC_PRESETS = NVENC_PRESETS
 
     def __init__(self, ffmpeg_path: str = "ffmpeg"):
         self.ffmpeg_path = ffmpeg_path
-        self._check_gpu_support()
-
-    def _check_gpu_support(self):
-        """Check if NVIDIA GPU encoding is available"""
-        try:
-            result = subprocess.run(
-                [self.ffmpeg_path, "-hide_banner", "-encoders"],
-                capture_output=True,
-                text=True
-            )
-            self.has_nvenc = "h264_nvenc" in result.stdout
-            self.has_cuda = "scale_cuda" in subprocess.run(
-                [self.ffmpeg_path, "-hide_banner", "-filters"],
-                capture_output=True,
-                text=True
-            ).stdout
-        except Exception:
-            self.has_nvenc = False
-            self.has_cuda = False
+        self.has_nvenc, self.has_cuda, self.has_libplacebo = _probe_ffmpeg(ffmpeg_path)
+        # (registered preset name, key) -> derived value; see _per_preset
+        self._compiled_presets: dict[tuple[str, str], Any] = {}
+        # NVML device handle, opened on first get_gpu_info() if pynvml is installed
+        self._nvml_handle = None
+        self._nvml_initialized = False
+
+    def __del__(self):
+        if getattr(self, "_nvml_initialized", False):
+            self._nvml_initialized = False
+            try:
+                import pynvml
+                pynvml.nvmlShutdown()
+            except Exception:
+                pass
 
     def build_gpu_command(
         self,
@@ -81,7 +212,36 @@ class GPUPipeline:
         Returns:
             List of FFmpeg command arguments
         """
-        cmd = [self.ffmpeg_path, "-hide_banner", "-y"]
+        if lut_path:
+            return self._build_command(input_path, output_path, preset, lut_path)
+
+        # Without a LUT only the input and output paths vary between builds,
+        # so a builder is generated once per registered preset and
+        # capability set
+        build = self._per_preset(
+            preset,
+            f"argv:{self.has_nvenc:d}{self.has_cuda:d}{self.has_libplacebo:d}",
+            lambda: _specialize_argv(self._compile_argv(preset))
+        )
+        return build(input_path, output_path)
+
+    def _compile_argv(self, preset: dict) -> tuple[str, ...]:
+        """Full FFmpeg argv for a preset, with {I}/{O} in place of the paths"""
+        return tuple(self._build_command(_INPUT, _OUTPUT, preset))
+
+    def _build_command(
+        self,
+        input_path: str,
+        output_path: str,
+        preset: dict,
+        lut_path: Optional[str] = None
+    ) -> list[str]:
+        """Build the FFmpeg command for build_gpu_command()"""
+        cmd = [
+            self.ffmpeg_path, "-hide_banner", "-y",
+            # Machine-readable progress on stdout instead of stderr stats
+            "-progress", "pipe:1", "-nostats",
+        ]
 
         # GPU hardware acceleration for decoding
         if preset.get("hwaccel", True) and self.has_nvenc:
@@ -92,61 +252,82 @@ class GPUPipeline:
 
         cmd.extend(["-i", input_path])
 
-        # Build filter chain
-        filters = self._build_filter_chain(preset, lut_path)
-        if filters:
-            cmd.extend(["-vf", filters])
+        # Build filter chain (registered presets compiled without filters
+        # skip it). Registered presets carry precompiled CPU and CUDA
+        # filtergraphs; a LUT or a libplacebo color pass still goes through
+        # the builder.
+        compiled = compiled_preset(preset)
+        if lut_path or compiled is None or compiled.has_filters:
+            use_cuda = self.has_cuda and preset.get("use_cuda", True)
+            precompiled = compiled is not None and not lut_path and not (
+                use_cuda and self.has_libplacebo and preset.get("eq")
+            )
+            if precompiled:
+                filters = compiled.vf_cuda if use_cuda else compiled.vf_cpu
+            else:
+                filters = self._build_filter_chain(preset, lut_path)
+            if filters:
+                cmd.extend(["-vf", filters])
 
-        # Video encoding
-        encoder = preset.get("encoder", "h264_nvenc" if self.has_nvenc else "libx264")
-        cmd.extend(["-c:v", encoder])
+        # Encoder, audio and container options (static per preset)
+        cmd.extend(self._output_args(preset))
+        cmd.extend(self._gpu_tuning_args(preset))
 
-        if "nvenc" in encoder:
-            # NVENC-specific options
-            nvenc_preset = self.NVENC_PRESETS.get(
-                preset.get("speed", "medium"), "p4"
-            )
-            cmd.extend([
-                "-preset", nvenc_preset,
-                "-rc", preset.get("rate_control", "vbr"),
-                "-cq", str(preset.get("cq", 23)),
-                "-b:v", preset.get("bitrate", "0"),
-                "-maxrate", preset.get("maxrate", "50M"),
-                "-bufsize", preset.get("bufsize", "100M"),
-            ])
+        cmd.append(output_path)
 
-            # GPU-specific tuning
-            if preset.get("tune"):
-                cmd.extend(["-tune", preset["tune"]])
+        return cmd
 
-            # B-frames for better compression
-            cmd.extend(["-bf", str(preset.get("bframes", 3))])
+    def _output_args(self, preset: dict) -> tuple[str, ...]:
+        """Encoder, audio and container arguments for a preset"""
+        # Precompiled at import for registered presets (which always name
+        # their encoder); copies and custom dicts are compiled as given
+        compiled = compiled_preset(preset)
+        if compiled is not None:
+            return compiled.argv
 
-        else:
-            # CPU fallback (libx264/libx265)
-            cmd.extend([
-                "-preset", preset.get("cpu_preset", "medium"),
-                "-crf", str(preset.get("crf", 23)),
-            ])
+        default_encoder = "h264_nvenc" if self.has_nvenc else "libx264"
+        return _compile_output_args(preset, default_encoder)
 
-        # Audio encoding
-        audio_codec = preset.get("audio_codec", "aac")
-        if audio_codec == "copy":
-            cmd.extend(["-c:a", "copy"])
-        else:
-            cmd.extend([
-                "-c:a", audio_codec,
-                "-b:a", preset.get("audio_bitrate", "128k"),
-                "-ar", str(preset.get("audio_sample_rate", 48000)),
-            ])
+    def _gpu_tuning_args(self, preset: dict) -> tuple[str, ...]:
+        """
+        NVENC options that depend on the installed GPU
 
-        # Output options
-        if preset.get("faststart", True):
-            cmd.extend(["-movflags", "+faststart"])
+        B-frames as references and full-resolution multipass are enabled
+        for quality speeds on Turing (compute capability 7.5) and newer.
+        """
+        compiled = compiled_preset(preset)
+        if compiled is not None:
+            family = compiled.encoder_family
+        else:
+            default_encoder = "h264_nvenc" if self.has_nvenc else "libx264"
+            family = encoder_family(preset.get("encoder", default_encoder))
+        if not family.is_nvenc or preset.get("speed", "medium") not in QUALITY_SPEEDS:
+            return ()
+
+        # Looked up on the module so tests can stub the probe
+        gpu = presets._probe_gpu()
+        if gpu is None or gpu[0] < 7.5:
+            return ()
+        return ("-b_ref_mode", "middle", "-multipass", "fullres")
+
+    def _per_preset(self, preset: dict, key: str, build: Callable[[], Any]) -> Any:
+        """
+        Return build() for a preset, computed once per registered preset and key
 
-        cmd.append(output_path)
+        Only registered presets are immutable, so only they are cached (and
+        the cache is bounded by the number of presets). Copies and custom
+        dicts may be edited between builds and are computed every time.
+        """
+        compiled = compiled_preset(preset)
+        if compiled is None:
+            return build()
 
-        return cmd
+        cache_key = (compiled.name, key)
+        try:
+            return self._compiled_presets[cache_key]
+        except KeyError:
+            value = self._compiled_presets[cache_key] = build()
+            return value
 
     def _build_filter_chain(
         self,
@@ -154,90 +335,44 @@ class GPUPipeline:
         lut_path: Optional[str] = None
     ) -> str:
         """Build FFmpeg filter chain with CUDA acceleration where possible"""
-        filters = []
-        use_cuda = self.has_cuda and preset.get("use_cuda", True)
-
-        # Hardware upload if not already on GPU
-        if use_cuda and not preset.get("hwaccel", True):
-            filters.append("hwupload_cuda")
-
-        # Scaling
-        if "scale" in preset:
-            w, h = preset["scale"]
-            if use_cuda:
-                filters.append(f"scale_cuda={w}:{h}")
-            else:
-                filters.append(f"scale={w}:{h}")
-
-        # Deinterlacing
-        if preset.get("deinterlace"):
-            if use_cuda:
-                filters.append("yadif_cuda=0:-1:0")
-            else:
-                filters.append("yadif=0:-1:0")
-
-        # HDR to SDR tone mapping
-        if preset.get("tonemap"):
-            if use_cuda:
-                filters.append("tonemap_cuda=tonemap=hable:peak=100")
-            else:
-                filters.append("zscale=t=linear:npl=100,tonemap=hable,zscale=t=bt709")
-
-        # Frame rate conversion
-        if "fps" in preset:
-            filters.append(f"fps={preset['fps']}")
-
-        # Download from GPU for CPU-based filters
-        needs_cpu_filters = lut_path or preset.get("eq") or preset.get("unsharp")
-        if use_cuda and needs_cpu_filters:
-            filters.append("hwdownload,format=nv12")
-
-        # Color grading with LUT
-        if lut_path:
-            # LUT application (CPU-based, but fast)
-            filters.append(f"lut3d='{lut_path}'")
-
-        # Color correction (eq filter)
-        if preset.get("eq"):
-            eq = preset["eq"]
-            eq_str = ",".join(f"{k}={v}" for k, v in eq.items())
-            filters.append(f"eq={eq_str}")
-
-        # Sharpening
-        if preset.get("unsharp"):
-            filters.append(f"unsharp={preset['unsharp']}")
-
-        # Film grain (for cinematic look)
-        if preset.get("grain"):
-            grain = preset["grain"]
-            filters.append(f"noise=c0s={grain}:c0f=t+u")
-
-        # Letterbox
-        if preset.get("letterbox"):
-            aspect = preset["letterbox"]
-            filters.append(f"pad=iw:iw/{aspect}:(ow-iw)/2:(oh-ih)/2:black")
-
-        # Vignette
-        if preset.get("vignette"):
-            filters.append(f"vignette=angle={preset['vignette']}")
-
-        return ",".join(filters) if filters else ""
+        use_cuda = bool(self.has_cuda and preset.get("use_cuda", True))
+        use_libplacebo = use_cuda and self.has_libplacebo
+        compiled = compiled_preset(preset)
+        if compiled is None:
+            return _compile_filter_chain(preset, lut_path, use_cuda, use_libplacebo)
+        return _filter_chain(compiled.name, lut_path, use_cuda, use_libplacebo)
 
     async def process_local(
         self,
         input_path: str,
         output_path: str,
         preset: dict,
-        lut_path: Optional[str] = None
+        lut_path: Optional[str] = None,
+        progress_callback: Optional[Callable[[dict], None]] = None
     ) -> dict:
         """
         Process video locally (for testing without AIDP)
 
+        ffmpeg's progress and log output are consumed as they are produced,
+        so memory stays bounded however long the encode runs.
+
+        Args:
+            progress_callback: Optional callback receiving each ffmpeg
+                -progress block (out_time_ms, fps, speed, progress, ...)
+
         Returns:
             dict with processing results and metrics
         """
         import time
 
+        # Encode on the CPU when FFmpeg has no NVENC, or when the GPU was
+        # probed and can't run the preset. An unprobeable GPU is given the
+        # benefit of the doubt. The probe blocks, so it runs in a thread;
+        # its result is cached for the NVENC tuning in build_gpu_command.
+        runnable = await asyncio.to_thread(is_runnable, preset)
+        if not self.has_nvenc or runnable is False:
+            preset = self._per_preset(preset, "cpu", lambda: cpu_fallback(preset))
+
         cmd = self.build_gpu_command(input_path, output_path, preset, lut_path)
 
         print(f"FFmpeg command: {' '.join(cmd)}")
@@ -250,27 +385,30 @@ class GPUPipeline:
             stderr=asyncio.subprocess.PIPE
         )
 
-        stdout, stderr = await process.communicate()
+        log_task = asyncio.create_task(_drain_log(process.stderr))
+
+        progress = {}
+        async for raw in process.stdout:
+            key, _, value = raw.decode(errors="replace").strip().partition("=")
+            progress[key] = value
+            if key == "progress" and progress_callback:
+                progress_callback(dict(progress))
+
+        log_tail, duration = await log_task
+        await process.wait()
 
         elapsed = time.time() - start_time
 
         if process.returncode != 0:
             return {
                 "success": False,
-                "error": stderr.decode(),
+                "error": log_tail,
                 "command": " ".join(cmd)
             }
 
-        # Get input duration for speedup calculation
-        probe_cmd = [
-            "ffprobe", "-v", "quiet",
-            "-print_format", "json",
-            "-show_format",
-            input_path
-        ]
-        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        probe_data = json.loads(probe_result.stdout) if probe_result.stdout else {}
-        duration = float(probe_data.get("format", {}).get("duration", elapsed))
+        # Get input duration for speedup calculation; ffmpeg already logged it
+        if duration is None:
+            duration = await self._probe_duration(input_path) or elapsed
 
         return {
             "success": True,
@@ -284,8 +422,36 @@ class GPUPipeline:
             }
         }
 
+    async def _probe_duration(self, input_path: str) -> Optional[float]:
+        """Get input duration in seconds via ffprobe, without blocking the loop"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ffprobe", "-v", "quiet",
+                "-print_format", "json",
+                "-show_format",
+                input_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await process.communicate()
+        except OSError:
+            return None
+
+        probe_data = json.loads(stdout) if stdout else {}
+        duration = probe_data.get("format", {}).get("duration")
+        return float(duration) if duration else None
+
     def get_gpu_info(self) -> dict:
-        """Get information about available GPU"""
+        """
+        Get information about available GPU
+
+        Queries NVML directly when pynvml is installed, avoiding an
+        nvidia-smi process per call; otherwise falls back to nvidia-smi.
+        """
+        info = self._nvml_gpu_info()
+        if info is not None:
+            return info
+
         try:
             result = subprocess.run(
                 ["nvidia-smi", "--query-gpu=name,memory.total,driver_version",
@@ -311,6 +477,42 @@ class GPUPipeline:
             "cuda_filters_available": False
         }
 
+    def _nvml_gpu_info(self) -> Optional[dict]:
+        """Get GPU information via NVML, or None if NVML is unavailable"""
+        try:
+            import pynvml
+        except ImportError:
+            return None
+
+        try:
+            # nvmlInit() is reference counted and __del__ shuts down once,
+            # so initialise once even if the handle lookup below fails
+            if not self._nvml_initialized:
+                pynvml.nvmlInit()
+                self._nvml_initialized = True
+            if self._nvml_handle is None:
+                self._nvml_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+
+            name = pynvml.nvmlDeviceGetName(self._nvml_handle)
+            driver = pynvml.nvmlSystemGetDriverVersion()
+            memory = pynvml.nvmlDeviceGetMemoryInfo(self._nvml_handle).total
+        except pynvml.NVMLError:
+            return None
+
+        # Older pynvml releases return bytes
+        if isinstance(name, bytes):
+            name = name.decode()
+        if isinstance(driver, bytes):
+            driver = driver.decode()
+
+        return {
+            "name": name,
+            "memory": f"{memory // (1024 * 1024)} MiB",
+            "driver": driver,
+            "nvenc_available": self.has_nvenc,
+            "cuda_filters_available": self.has_cuda
+        }
+
 
 # Export for easy importing
 __all__ = ["GPUPipeline"]
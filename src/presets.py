@@ -3,25 +3,79 @@ Video Processing Presets for AIDP Video Forge
 Each preset defines GPU-optimized encoding and filter settings
 """
 
+import array
+import bisect
+import functools
+import os
+import subprocess
+import sys
+from enum import IntEnum
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, NamedTuple, Optional
+
+
+# Directory holding the presets' preferred LUTs (override with AIDP_LUTS_DIR)
+LUTS_DIR = Path(os.environ.get(
+    "AIDP_LUTS_DIR",
+    Path(__file__).parent.parent.parent / "ColorGrading" / "LUTs"
+)).resolve()
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict used for presets
+
+    Presets are shared by every caller, so mutating one would leak into
+    unrelated jobs. Copy with dict(preset) to customise a preset.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    # Contents are immutable all the way down, so copies can be shared
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # Registered presets pickle by name, so worker processes get their
+        # own module-level preset instead of a copy of every value
+        name = _REGISTERED_NAMES.get(id(self))
+        if name is not None:
+            return _registered_preset, (name,)
+        return type(self), (dict(self),)
+
+
+# Settings shared by most presets; each preset overrides what it changes
+_BASE_H264 = {
+    "encoder": "h264_nvenc",
+    "rate_control": "vbr",
+    "audio_codec": "aac",
+    "faststart": True,
+}
+_BASE_HEVC = {**_BASE_H264, "encoder": "hevc_nvenc"}
+
 PRESETS = {
     "default": {
         "description": "Standard web-optimized output with GPU encoding",
-        "encoder": "h264_nvenc",
+        **_BASE_H264,
         "speed": "medium",
         "cq": 23,
-        "rate_control": "vbr",
-        "audio_codec": "aac",
         "audio_bitrate": "128k",
-        "faststart": True,
         "min_vram_gb": 4,
     },
 
     "cinematic": {
         "description": "Film-like output with teal-orange grade, grain, and letterbox",
-        "encoder": "h264_nvenc",
+        **_BASE_H264,
         "speed": "quality",
         "cq": 20,
-        "rate_control": "vbr",
         "bframes": 4,
         "eq": {
             "brightness": 0.02,
@@ -31,16 +85,14 @@ PRESETS = {
         "grain": 8,  # Subtle film grain
         "letterbox": 2.39,  # Cinema aspect ratio
         "unsharp": "5:5:0.5:5:5:0.5",
-        "audio_codec": "aac",
         "audio_bitrate": "192k",
-        "faststart": True,
         "min_vram_gb": 6,
         "preferred_lut": "Cinematic_Teal_Orange.cube",
     },
 
     "broadcast": {
         "description": "Broadcast-safe output for TV/streaming platforms",
-        "encoder": "h264_nvenc",
+        **_BASE_H264,
         "speed": "quality",
         "cq": 18,
         "rate_control": "cbr",
@@ -49,20 +101,17 @@ PRESETS = {
         "bufsize": "30M",
         "scale": (1920, 1080),
         "fps": 29.97,
-        "audio_codec": "aac",
         "audio_bitrate": "256k",
         "audio_sample_rate": 48000,
-        "faststart": True,
         "min_vram_gb": 6,
         "preferred_lut": "Broadcast_Safe.cube",
     },
 
     "social_vertical": {
         "description": "Vertical 9:16 output optimized for TikTok/Reels/Shorts",
-        "encoder": "h264_nvenc",
+        **_BASE_H264,
         "speed": "fast",
         "cq": 22,
-        "rate_control": "vbr",
         "scale": (1080, 1920),
         "fps": 30,
         "eq": {
@@ -71,98 +120,81 @@ PRESETS = {
             "saturation": 1.2,
         },
         "unsharp": "3:3:0.8",
-        "audio_codec": "aac",
         "audio_bitrate": "128k",
-        "faststart": True,
         "min_vram_gb": 4,
     },
 
     "hdr_to_sdr": {
         "description": "Convert HDR content to SDR with GPU tone mapping",
-        "encoder": "h264_nvenc",
+        **_BASE_H264,
         "speed": "medium",
         "cq": 20,
-        "rate_control": "vbr",
         "hwaccel": True,
         "tonemap": True,  # Enable CUDA tone mapping
         "audio_codec": "copy",
-        "faststart": True,
         "min_vram_gb": 8,
         "cuda_compute": "7.5",  # Requires newer GPU for tone mapping
     },
 
     "hevc_master": {
         "description": "High-quality HEVC output for archival/master",
-        "encoder": "hevc_nvenc",
+        **_BASE_HEVC,
         "speed": "quality",
         "cq": 18,
-        "rate_control": "vbr",
         "bframes": 4,
-        "audio_codec": "aac",
         "audio_bitrate": "320k",
         "audio_sample_rate": 48000,
-        "faststart": True,
         "min_vram_gb": 8,
     },
 
     "fast_preview": {
         "description": "Fast preview encode for quick review",
-        "encoder": "h264_nvenc",
+        **_BASE_H264,
         "speed": "fastest",
         "cq": 28,
-        "rate_control": "vbr",
         "scale": (1280, 720),
         "fps": 30,
-        "audio_codec": "aac",
         "audio_bitrate": "96k",
-        "faststart": True,
         "min_vram_gb": 2,
     },
 
     "youtube": {
         "description": "YouTube recommended settings with GPU encoding",
-        "encoder": "h264_nvenc",
+        **_BASE_H264,
         "speed": "medium",
         "cq": 18,
-        "rate_control": "vbr",
         "bitrate": "0",
         "maxrate": "40M",
         "bufsize": "80M",
         "bframes": 2,
         "scale": (3840, 2160),  # 4K
         "fps": 60,
-        "audio_codec": "aac",
         "audio_bitrate": "384k",
         "audio_sample_rate": 48000,
-        "faststart": True,
         "min_vram_gb": 8,
     },
 
     "netflix": {
         "description": "Netflix delivery specification",
-        "encoder": "hevc_nvenc",
+        **_BASE_HEVC,
         "speed": "quality",
         "cq": 16,
-        "rate_control": "vbr",
         "bitrate": "0",
         "maxrate": "25M",
         "bufsize": "50M",
         "bframes": 4,
         "scale": (3840, 2160),
         "fps": 23.976,
-        "audio_codec": "aac",
         "audio_bitrate": "448k",
         "audio_sample_rate": 48000,
-        "faststart": True,
         "min_vram_gb": 10,
     },
 
     "vintage_film": {
         "description": "Vintage film look with faded colors and heavy grain",
-        "encoder": "h264_nvenc",
+        **_BASE_H264,
         "speed": "quality",
         "cq": 20,
-        "rate_control": "vbr",
         "eq": {
             "brightness": -0.02,
             "contrast": 0.95,
@@ -172,38 +204,32 @@ PRESETS = {
         "grain": 25,  # Heavy grain
         "vignette": 0.4,
         "letterbox": 1.66,  # Old film aspect
-        "audio_codec": "aac",
         "audio_bitrate": "128k",
-        "faststart": True,
         "min_vram_gb": 6,
         "preferred_lut": "Vintage_Fade.cube",
     },
 
     "documentary": {
         "description": "Clean, natural look for documentary content",
-        "encoder": "h264_nvenc",
+        **_BASE_H264,
         "speed": "quality",
         "cq": 19,
-        "rate_control": "vbr",
         "eq": {
             "brightness": 0.01,
             "contrast": 1.02,
             "saturation": 0.95,
         },
         "unsharp": "3:3:0.3",
-        "audio_codec": "aac",
         "audio_bitrate": "192k",
-        "faststart": True,
         "min_vram_gb": 6,
         "preferred_lut": "Documentary_Natural.cube",
     },
 
     "action": {
         "description": "High contrast, punchy colors for action content",
-        "encoder": "h264_nvenc",
+        **_BASE_H264,
         "speed": "medium",
         "cq": 19,
-        "rate_control": "vbr",
         "bframes": 2,
         "eq": {
             "brightness": 0.0,
@@ -211,15 +237,358 @@ PRESETS = {
             "saturation": 1.3,
         },
         "unsharp": "5:5:1.0:5:5:0.5",
-        "audio_codec": "aac",
         "audio_bitrate": "256k",
-        "faststart": True,
         "min_vram_gb": 6,
         "preferred_lut": "Blockbuster_Action.cube",
     },
 }
 
+# NVENC presets (quality/speed tradeoff)
+NVENC_PRESETS = {
+    "fastest": "p1",
+    "fast": "p2",
+    "medium": "p4",
+    "slow": "p5",
+    "quality": "p6",
+    "best": "p7",
+}
+
+# Speeds that get low-latency tuning vs. lookahead/AQ quality tuning
+FAST_SPEEDS = frozenset({"fastest", "fast"})
+QUALITY_SPEEDS = frozenset({"slow", "quality", "best"})
+
+
+class EncoderFamily(IntEnum):
+    """Encoder families that share FFmpeg option handling"""
+    H264_NVENC = 0
+    HEVC_NVENC = 1
+    AV1_NVENC = 2
+    LIBX264 = 3
+    LIBX265 = 4
+
+    @property
+    def is_nvenc(self) -> bool:
+        return self <= EncoderFamily.AV1_NVENC
+
+
+_ENCODER_MAP = {
+    "h264_nvenc": EncoderFamily.H264_NVENC,
+    "hevc_nvenc": EncoderFamily.HEVC_NVENC,
+    "av1_nvenc": EncoderFamily.AV1_NVENC,
+    "libx264": EncoderFamily.LIBX264,
+    "libx265": EncoderFamily.LIBX265,
+}
+
+
+def encoder_family(encoder: str) -> EncoderFamily:
+    """Get the family of an FFmpeg encoder, guessing NVENC vs. CPU for unknown names"""
+    family = _ENCODER_MAP.get(encoder)
+    if family is None:
+        family = EncoderFamily.H264_NVENC if "nvenc" in encoder else EncoderFamily.LIBX264
+    return family
+
+
+# Preset keys that add a video filter in GPUPipeline
+_FILTER_KEYS = (
+    "scale", "deinterlace", "tonemap", "fps",
+    "eq", "unsharp", "grain", "letterbox", "vignette",
+)
+
+
+def _compile_filter_chain(
+    preset: dict,
+    lut_path: Optional[str] = None,
+    use_cuda: bool = False,
+    use_libplacebo: bool = False
+) -> str:
+    """Build the FFmpeg -vf filter chain for a preset"""
+    filters = []
+
+    # Hardware upload if not already on GPU
+    if use_cuda and not preset.get("hwaccel", True):
+        filters.append("hwupload_cuda")
+
+    # Scaling
+    if "scale" in preset:
+        size = "{}:{}".format(*preset["scale"])
+        if use_cuda:
+            filters.append(f"scale_cuda={size}")
+        else:
+            filters.append(f"scale={size}")
+
+    # Deinterlacing
+    if preset.get("deinterlace"):
+        if use_cuda:
+            filters.append("yadif_cuda=0:-1:0")
+        else:
+            filters.append("yadif=0:-1:0")
+
+    # HDR to SDR tone mapping
+    if preset.get("tonemap"):
+        if use_cuda:
+            filters.append("tonemap_cuda=tonemap=hable:peak=100")
+        else:
+            filters.append("zscale=t=linear:npl=100,tonemap=hable,zscale=t=bt709")
+
+    # Frame rate conversion
+    if "fps" in preset:
+        filters.append(f"fps={preset['fps']}")
+
+    # LUT + color correction in a single Vulkan pass when libplacebo is
+    # available. CUDA frames can't be mapped to Vulkan, so they are
+    # transferred there and back; that only beats one hwdownload when no
+    # CPU-only filter follows, which would need its own download anyway.
+    eq = preset.get("eq")
+    cpu_only_filters = (
+        preset.get("unsharp") or preset.get("grain")
+        or preset.get("letterbox") or preset.get("vignette")
+    )
+    use_placebo = use_libplacebo and (lut_path or eq) and not cpu_only_filters
+    if use_placebo:
+        options = [f"lut='{lut_path}'"] if lut_path else []
+        options.extend(f"{k}={v}" for k, v in dict(eq or ()).items())
+        filters.append(
+            "hwupload=derive_device=vulkan,"
+            f"libplacebo={':'.join(options)},"
+            "hwupload=derive_device=cuda"
+        )
+
+    # Download from GPU for CPU-based filters
+    needs_cpu_filters = cpu_only_filters or (not use_placebo and (lut_path or eq))
+    if use_cuda and needs_cpu_filters:
+        filters.append("hwdownload,format=nv12")
+
+    if not use_placebo:
+        # Color grading with LUT
+        if lut_path:
+            # LUT application (CPU-based, but fast)
+            filters.append(f"lut3d='{lut_path}'")
+
+        # Color correction (eq filter)
+        if eq:
+            eq_str = ":".join(f"{k}={v}" for k, v in dict(eq).items())
+            filters.append(f"eq={eq_str}")
+
+    # Sharpening
+    if preset.get("unsharp"):
+        filters.append(f"unsharp={preset['unsharp']}")
+
+    # Film grain (for cinematic look)
+    if preset.get("grain"):
+        grain = preset["grain"]
+        filters.append(f"noise=c0s={grain}:c0f=t+u")
+
+    # Letterbox
+    if preset.get("letterbox"):
+        aspect = preset["letterbox"]
+        filters.append(f"pad=iw:iw/{aspect}:(ow-iw)/2:(oh-ih)/2:black")
+
+    # Vignette
+    if preset.get("vignette"):
+        filters.append(f"vignette=angle={preset['vignette']}")
+
+    return ",".join(filters) if filters else ""
+
+
+def _nvenc_args(args: list[str], preset: dict):
+    """Append NVENC rate control and tuning options"""
+    args.extend([
+        "-preset", NVENC_PRESETS.get(preset.get("speed", "medium"), "p4"),
+        "-rc", preset.get("rate_control", "vbr"),
+        "-cq", str(preset.get("cq", 23)),
+        "-b:v", preset.get("bitrate", "0"),
+        "-maxrate", preset.get("maxrate", "50M"),
+        "-bufsize", preset.get("bufsize", "100M"),
+    ])
+
+    # GPU-specific tuning
+    speed = preset.get("speed", "medium")
+    if preset.get("tune"):
+        args.extend(["-tune", preset["tune"]])
+    elif speed in FAST_SPEEDS:
+        args.extend(["-tune", "ll"])
+
+    # B-frames for better compression
+    args.extend(["-bf", str(preset.get("bframes", 3))])
+
+    # Quality presets: lookahead and adaptive quantization (GPU-dependent
+    # options are added by GPUPipeline)
+    if speed in QUALITY_SPEEDS:
+        args.extend([
+            "-rc-lookahead", "32",
+            "-spatial-aq", "1",
+            "-temporal-aq", "1",
+        ])
+
+
+def _cpu_args(args: list[str], preset: dict):
+    """Append CPU encoder (libx264/libx265) options"""
+    args.extend([
+        "-preset", preset.get("cpu_preset", "medium"),
+        "-crf", str(preset.get("crf", 23)),
+    ])
+
+
+# Encoder option handlers, indexed by EncoderFamily
+_ENCODER_HANDLERS = (
+    _nvenc_args,  # H264_NVENC
+    _nvenc_args,  # HEVC_NVENC
+    _nvenc_args,  # AV1_NVENC
+    _cpu_args,    # LIBX264
+    _cpu_args,    # LIBX265
+)
+
+
+def _compile_output_args(
+    preset: dict,
+    default_encoder: str = "h264_nvenc"
+) -> tuple[str, ...]:
+    """Translate a preset's encoder, audio and output settings into FFmpeg arguments"""
+    # Video encoding
+    encoder = preset.get("encoder", default_encoder)
+    args = ["-c:v", encoder]
+    _ENCODER_HANDLERS[encoder_family(encoder)](args, preset)
+
+    # Audio encoding
+    audio_codec = preset.get("audio_codec", "aac")
+    if audio_codec == "copy":
+        args.extend(["-c:a", "copy"])
+    else:
+        args.extend([
+            "-c:a", audio_codec,
+            "-b:a", preset.get("audio_bitrate", "128k"),
+            "-ar", str(preset.get("audio_sample_rate", 48000)),
+        ])
 
+    # Output options
+    if preset.get("faststart", True):
+        args.extend(["-movflags", "+faststart"])
+
+    return tuple(args)
+
+
+# Fields every preset must define
+_REQUIRED_FIELDS = frozenset({"description", "encoder", "min_vram_gb"})
+
+# Fail at import rather than mid-batch if a preset is incomplete
+for _name, _preset in PRESETS.items():
+    if not _REQUIRED_FIELDS <= _preset.keys():
+        raise ValueError(
+            f"Preset {_name} missing fields: {sorted(_REQUIRED_FIELDS - _preset.keys())}"
+        )
+
+
+def _freeze_value(value: Any) -> Any:
+    """
+    Recursively convert dicts to FrozenDict and lists to tuples
+
+    Strings are interned, so the encoder, codec and rate control tokens
+    repeated across presets share one object each.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return FrozenDict({
+            sys.intern(k): _freeze_value(v) for k, v in value.items()
+        })
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_value(v) for v in value)
+    return value
+
+
+# Presets are read-only from here on
+PRESETS = MappingProxyType({
+    sys.intern(name): _freeze_value(preset) for name, preset in PRESETS.items()
+})
+
+_PRESET_NAMES: tuple[str, ...] = tuple(PRESETS)
+
+# id() of each registered preset -> its name, for FrozenDict.__reduce__
+_REGISTERED_NAMES = {id(preset): name for name, preset in PRESETS.items()}
+
+
+def _registered_preset(name: str) -> FrozenDict:
+    """Look up a registered preset when unpickling"""
+    return PRESETS[name]
+
+
+class CompiledPreset(NamedTuple):
+    """Static FFmpeg data derived from a registered preset at import"""
+    name: str
+    encoder_family: EncoderFamily
+    # False when the preset needs no -vf at all (no LUT or CPU fallback)
+    has_filters: bool
+    # "WxH" for display, if the preset scales
+    scale_x_str: Optional[str]
+    # Absolute path of the preferred LUT, if the preset names one
+    lut_path: Optional[str]
+    # Encoder, audio and container arguments
+    argv: tuple[str, ...]
+    # Filtergraphs without a LUT, for CPU and CUDA filtering
+    vf_cpu: str
+    vf_cuda: str
+
+
+def _lut_path(preset: dict) -> Optional[str]:
+    """Resolve a preset's preferred LUT under LUTS_DIR"""
+    lut = preset.get("preferred_lut")
+    return str(LUTS_DIR / lut) if lut else None
+
+
+def _compile_preset(name: str, preset: dict) -> CompiledPreset:
+    """Partially evaluate a registered preset into its static FFmpeg arguments"""
+    width, height = preset.get("scale", (None, None))
+    return CompiledPreset(
+        name=name,
+        encoder_family=encoder_family(preset["encoder"]),
+        has_filters=(
+            not preset.get("hwaccel", True)
+            or any(preset.get(key) for key in _FILTER_KEYS)
+        ),
+        scale_x_str=f"{width}x{height}" if width else None,
+        lut_path=_lut_path(preset),
+        argv=_compile_output_args(preset),
+        vf_cpu=_compile_filter_chain(preset),
+        vf_cuda=_compile_filter_chain(preset, use_cuda=True),
+    )
+
+
+# id() of each registered preset -> its compiled data. This lives outside
+# the presets so a dict(preset) copy, which may then be edited, never
+# carries data compiled from the original settings.
+_COMPILED: dict[int, CompiledPreset] = {
+    id(preset): _compile_preset(name, preset) for name, preset in PRESETS.items()
+}
+
+
+def compiled_preset(preset: dict) -> Optional[CompiledPreset]:
+    """Get the compiled data for a registered preset, or None for any other dict"""
+    compiled = _COMPILED.get(id(preset))
+    if compiled is not None and PRESETS[compiled.name] is preset:
+        return compiled
+    return None
+
+
+def preferred_lut_path(preset: dict) -> Optional[str]:
+    """Get the absolute path of a preset's preferred LUT, if it names one"""
+    compiled = compiled_preset(preset)
+    if compiled is not None:
+        return compiled.lut_path
+    return _lut_path(preset)
+
+
+# Encoder and VRAM requirement per preset, aligned with _PRESET_NAMES, so
+# find_presets() scans flat sequences instead of every preset dict
+_ENCODERS: tuple[str, ...] = tuple(PRESETS[name]["encoder"] for name in _PRESET_NAMES)
+_MIN_VRAM = array.array("f", (PRESETS[name]["min_vram_gb"] for name in _PRESET_NAMES))
+
+# (min_vram_gb, name) sorted by VRAM requirement, for presets_fitting()
+_PRESETS_BY_VRAM: list[tuple[int, str]] = sorted(
+    (preset.get("min_vram_gb", 0), name) for name, preset in PRESETS.items()
+)
+
+
+@functools.lru_cache(maxsize=64)
 def get_preset(name: str) -> dict:
     """Get a preset by name, with fallback to default"""
     return PRESETS.get(name, PRESETS["default"])
@@ -227,7 +596,132 @@ def get_preset(name: str) -> dict:
 
 def list_presets() -> list[str]:
     """List all available preset names"""
-    return list(PRESETS.keys())
+    return list(_PRESET_NAMES)
+
+
+def presets_fitting(vram_gb: float) -> list[str]:
+    """List the presets whose min_vram_gb fits in the given amount of VRAM"""
+    end = bisect.bisect_right(_PRESETS_BY_VRAM, (vram_gb, "\uffff"))
+    return [name for _, name in _PRESETS_BY_VRAM[:end]]
+
+
+def _probe_gpu_nvml() -> Optional[tuple[float, float]]:
+    """Probe the first GPU through NVML, or None if pynvml or the driver is unavailable"""
+    try:
+        import pynvml
+    except ImportError:
+        return None
+
+    try:
+        pynvml.nvmlInit()
+    except pynvml.NVMLError:
+        return None
+    try:
+        handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+        major, minor = pynvml.nvmlDeviceGetCudaComputeCapability(handle)
+        memory = pynvml.nvmlDeviceGetMemoryInfo(handle).total
+    except pynvml.NVMLError:
+        return None
+    finally:
+        pynvml.nvmlShutdown()
+    return float(f"{major}.{minor}"), float(round(memory / 1024 ** 3))
+
+
+def _probe_gpu_smi() -> Optional[tuple[float, float]]:
+    """Probe the first GPU through nvidia-smi, or None if the query fails"""
+    try:
+        result = subprocess.run(
+            ["nvidia-smi", "--query-gpu=compute_cap,memory.total",
+             "--format=csv,noheader,nounits"],
+            capture_output=True,
+            text=True,
+            timeout=2
+        )
+        if result.returncode == 0:
+            compute_cap, memory_mib = result.stdout.splitlines()[0].split(",")
+            return float(compute_cap), float(round(float(memory_mib) / 1024))
+    except (OSError, subprocess.SubprocessError, ValueError, IndexError):
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _probe_gpu() -> Optional[tuple[float, float]]:
+    """
+    Get the CUDA compute capability and VRAM (GB) of the first GPU
+
+    Queries NVML when pynvml is installed, otherwise nvidia-smi. VRAM is
+    rounded to whole GB, since cards report slightly less than their
+    nominal size (an 8 GB card may report 8188 MiB). Blocking, so async
+    callers should run it in a thread; the result is cached.
+
+    Returns:
+        (compute_capability, vram_gb), or None if the GPU could not be
+        probed (no driver, nvidia-smi missing or too old for compute_cap)
+    """
+    return _probe_gpu_nvml() or _probe_gpu_smi()
+
+
+def is_runnable(preset: dict) -> Optional[bool]:
+    """
+    Check the local GPU meets a preset's compute capability and VRAM needs
+
+    Returns None when the GPU could not be probed, so callers can tell an
+    unknown GPU apart from one that is too small.
+    """
+    gpu = _probe_gpu()
+    if gpu is None:
+        return None
+    compute_cap, vram_gb = gpu
+    return (
+        compute_cap >= float(preset.get("cuda_compute", 0))
+        and vram_gb >= preset.get("min_vram_gb", 0)
+    )
+
+
+def runnable_presets() -> list[str]:
+    """List the presets the local GPU is known to run"""
+    return [name for name in _PRESET_NAMES if is_runnable(PRESETS[name])]
+
+
+def cpu_fallback(preset: dict) -> dict:
+    """Copy of a preset that runs entirely on the CPU, encoding with libx264/libx265"""
+    compiled = compiled_preset(preset)
+    if compiled is not None:
+        family = compiled.encoder_family
+    else:
+        family = encoder_family(preset.get("encoder", "h264_nvenc"))
+    if family is EncoderFamily.HEVC_NVENC:
+        encoder = "libx265"
+    elif family.is_nvenc:
+        encoder = "libx264"
+    else:
+        encoder = preset["encoder"]
+
+    fallback = dict(preset)
+    fallback["encoder"] = encoder
+    fallback["hwaccel"] = False
+    fallback["use_cuda"] = False
+    return FrozenDict(fallback)
+
+
+def find_presets(
+    encoder: Optional[str] = None,
+    max_vram: Optional[float] = None
+) -> list[str]:
+    """
+    Find presets by encoder and/or VRAM requirement
+
+    Args:
+        encoder: Only presets using this encoder (e.g. "hevc_nvenc")
+        max_vram: Only presets needing at most this much VRAM (GB)
+    """
+    return [
+        name for name, preset_encoder, min_vram
+        in zip(_PRESET_NAMES, _ENCODERS, _MIN_VRAM)
+        if (encoder is None or preset_encoder == encoder)
+        and (max_vram is None or min_vram <= max_vram)
+    ]
 
 
 def get_preset_description(name: str) -> str:
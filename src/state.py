@@ -0,0 +1,110 @@
+"""
+Batch State - Persistent record of AIDP uploads and jobs
+Lets interrupted batch runs resume without re-uploading or resubmitting
+"""
+
+import sqlite3
+import time
+from typing import Optional
+
+# Default database file name, created inside the batch output directory
+STATE_DB_NAME = ".forge-state.db"
+
+# Job states, in the order a video moves through them
+UPLOADED = "uploaded"
+SUBMITTED = "submitted"
+COMPLETED = "completed"
+
+
+class JobStore:
+    """
+    SQLite-backed store of batch jobs, keyed by input file SHA256
+
+    Uses WAL journaling so the concurrent per-video pipeline can record
+    progress cheaply, and every write is committed immediately so state
+    survives a crash mid-batch.
+    """
+
+    def __init__(self, path: str = STATE_DB_NAME):
+        self.path = path
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs(
+                input_hash TEXT PRIMARY KEY,
+                file_id TEXT,
+                job_id TEXT,
+                preset TEXT,
+                lut TEXT,
+                output TEXT,
+                status TEXT,
+                completed_at INTEGER
+            )
+            """
+        )
+        # Databases written before LUTs were recorded lack the column
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "lut" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN lut TEXT")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Close the database connection"""
+        self._conn.close()
+
+    def get(self, input_hash: str) -> Optional[dict]:
+        """Get the recorded state for an input file, if any"""
+        row = self._conn.execute(
+            "SELECT * FROM jobs WHERE input_hash = ?", (input_hash,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def record_upload(self, input_hash: str, file_id: str):
+        """Record that an input file is stored on AIDP as file_id"""
+        self._conn.execute(
+            """
+            INSERT INTO jobs(input_hash, file_id, status) VALUES (?, ?, ?)
+            ON CONFLICT(input_hash) DO UPDATE SET
+                file_id = excluded.file_id,
+                job_id = NULL,
+                status = excluded.status,
+                completed_at = NULL
+            """,
+            (input_hash, file_id, UPLOADED)
+        )
+
+    def record_job(
+        self,
+        input_hash: str,
+        job_id: str,
+        preset: str,
+        output: str,
+        lut: Optional[str] = None
+    ):
+        """Record a submitted job for an uploaded input file and the LUT it applies"""
+        self._conn.execute(
+            """
+            UPDATE jobs SET job_id = ?, preset = ?, lut = ?, output = ?, status = ?,
+                completed_at = NULL
+            WHERE input_hash = ?
+            """,
+            (job_id, preset, lut, output, SUBMITTED, input_hash)
+        )
+
+    def mark_completed(self, input_hash: str):
+        """Record that a job's output has been downloaded"""
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, completed_at = ? WHERE input_hash = ?",
+            (COMPLETED, int(time.time()), input_hash)
+        )
+
+
+__all__ = ["JobStore", "STATE_DB_NAME"]
@@ -0,0 +1,28 @@
+"""
+Shared fixtures for AIDP Video Forge tests
+"""
+
+import pytest
+
+import presets
+from gpu_pipeline import GPUPipeline
+
+
+@pytest.fixture(scope="session")
+def pipeline():
+    """
+    One GPUPipeline shared by the whole session, so FFmpeg is probed once
+
+    Tests that force capabilities must use monkeypatch.setattr so the
+    change is undone afterwards.
+    """
+    return GPUPipeline()
+
+
+@pytest.fixture(autouse=True)
+def no_gpu_probe(monkeypatch):
+    """
+    Report the GPU as unprobeable, so tests never spawn nvidia-smi or load
+    NVML and build the same commands on GPU and non-GPU hosts
+    """
+    monkeypatch.setattr(presets, "_probe_gpu", lambda: None)
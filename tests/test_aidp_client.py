@@ -0,0 +1,292 @@
+"""
+Tests for the AIDP client against a local fake AIDP server
+"""
+
+import asyncio
+import hashlib
+import os
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import aidp_client
+from aidp_client import AIDPClient, AIDPError, AIDPJobFailed
+
+
+class FakeAIDP:
+    """Minimal AIDP API and presigned storage, recording what clients send"""
+
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+        self.parts: dict[str, dict[int, bytes]] = {}
+        self.upload_requests: list[dict] = []
+        self.put_headers: list[dict] = []
+        self.completions: list[dict] = []
+        self.jobs: dict[str, dict] = {}
+        self.status_headers: list[dict] = []
+        self.range_requests: list[str] = []
+        self.ws_attempts = 0
+        # Knobs tests turn to change server behaviour
+        self.part_size = None  # None: single presigned PUT
+        self.extra_parts = 0
+        self.events = False
+        self.ranges = True
+        self.url = ""
+
+        self.app = web.Application()
+        self.app.router.add_post("/v1/storage/upload", self.upload_request)
+        self.app.router.add_post("/v1/storage/upload/{fid}/complete", self.complete)
+        self.app.router.add_put("/put/{fid}", self.put)
+        self.app.router.add_put("/put/{fid}/{part}", self.put_part)
+        self.app.router.add_post("/v1/jobs/submit", self.submit)
+        self.app.router.add_get("/v1/jobs/{jid}", self.status)
+        self.app.router.add_get("/v1/jobs/{jid}/ws", self.events_ws)
+        self.app.router.add_get("/v1/storage/download/{fid}", self.download_request)
+        # Presigned GET URLs reject any other method, HEAD included
+        self.app.router.add_get("/get/{fid}", self.get, allow_head=False)
+
+    async def upload_request(self, request):
+        body = await request.json()
+        self.upload_requests.append(body)
+        fid = f"file-{len(self.upload_requests)}"
+        info = {
+            "file_id": fid,
+            "storage_url": f"aidp://{fid}",
+            "upload_url": f"{self.url}/put/{fid}",
+        }
+        if self.part_size:
+            count = -(-body["size"] // self.part_size) + self.extra_parts
+            info["parts"] = [f"{self.url}/put/{fid}/{i}" for i in range(count)]
+            info["part_size"] = self.part_size
+            self.parts[fid] = {}
+        return web.json_response(info)
+
+    async def put(self, request):
+        self.put_headers.append(dict(request.headers))
+        self.files[request.match_info["fid"]] = await request.read()
+        return web.Response()
+
+    async def put_part(self, request):
+        part = int(request.match_info["part"])
+        self.parts[request.match_info["fid"]][part] = await request.read()
+        return web.Response(headers={"ETag": f'"etag-{part}"'})
+
+    async def complete(self, request):
+        fid = request.match_info["fid"]
+        self.completions.append(await request.json())
+        parts = self.parts[fid]
+        self.files[fid] = b"".join(parts[i] for i in sorted(parts))
+        return web.json_response({})
+
+    async def submit(self, request):
+        body = await request.json()
+        jid = f"job-{len(self.jobs) + 1}"
+        self.jobs[jid] = {"config": body, "polls": 0}
+        return web.json_response({"job_id": jid, "assigned_node": "node-1"})
+
+    async def status(self, request):
+        self.status_headers.append(dict(request.headers))
+        job = self.jobs.get(request.match_info["jid"])
+        if job is None:
+            raise web.HTTPNotFound(text="no such job")
+        if job.get("error"):
+            return web.json_response({"status": "failed", "error": job["error"]})
+        if job.get("unavailable"):
+            raise web.HTTPServiceUnavailable()
+        job["polls"] += 1
+        if job["polls"] >= 3:
+            return web.json_response({"status": "completed", "output_file_id": "out"})
+        if request.headers.get("If-None-Match") == '"processing"':
+            return web.Response(status=304, headers={"ETag": '"processing"'})
+        return web.json_response(
+            {"status": "processing", "progress": 50}, headers={"ETag": '"processing"'}
+        )
+
+    async def events_ws(self, request):
+        self.ws_attempts += 1
+        if not self.events:
+            raise web.HTTPNotFound()
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"status": "processing", "progress": 50})
+        await ws.send_json({"status": "completed", "output_file_id": "out"})
+        await ws.close()
+        return ws
+
+    async def download_request(self, request):
+        return web.json_response(
+            {"download_url": f"{self.url}/get/{request.match_info['fid']}"}
+        )
+
+    async def get(self, request):
+        data = self.files[request.match_info["fid"]]
+        byte_range = request.headers.get("Range")
+        if not (byte_range and self.ranges):
+            return web.Response(body=data)
+        self.range_requests.append(byte_range)
+        start, end = (int(n) for n in byte_range.split("=")[1].split("-"))
+        return web.Response(
+            status=206,
+            body=data[start:end + 1],
+            headers={"Content-Range": f"bytes {start}-{end}/{len(data)}"},
+        )
+
+
+@pytest.fixture
+async def server():
+    """Fake AIDP server on a local port"""
+    fake = FakeAIDP()
+    test_server = TestServer(fake.app)
+    await test_server.start_server()
+    fake.url = str(test_server.make_url("")).rstrip("/")
+    yield fake
+    await test_server.close()
+
+
+@pytest.fixture
+async def client(server):
+    """AIDPClient talking to the fake server"""
+    async with AIDPClient(api_url=server.url) as aidp:
+        yield aidp
+
+
+@pytest.fixture
+def video(tmp_path):
+    """3500-byte input file"""
+    path = tmp_path / "in.mp4"
+    path.write_bytes(os.urandom(3500))
+    return path
+
+
+class TestUpload:
+    """Test file uploads"""
+
+    async def test_single_put_with_hash(self, server, client, video):
+        """Test small uploads send one PUT carrying the SHA256"""
+        result = await client.upload_file(str(video))
+
+        data = video.read_bytes()
+        assert server.files[result["file_id"]] == data
+        assert result["hash"] == hashlib.sha256(data).hexdigest()
+        assert server.put_headers[0]["x-amz-meta-sha256"] == result["hash"]
+
+    async def test_multipart_upload(self, server, client, video):
+        """Test presigned parts are uploaded and completed in order"""
+        server.part_size = 1000
+        result = await client.upload_file(str(video))
+
+        assert server.files[result["file_id"]] == video.read_bytes()
+        completion = server.completions[0]
+        assert completion["hash"] == result["hash"]
+        assert completion["parts"] == [
+            {"part_number": i + 1, "etag": f'"etag-{i}"'} for i in range(4)
+        ]
+
+    async def test_multipart_rejects_extra_parts(self, server, client, video):
+        """Test more part URLs than the file needs is an error, not an empty PUT"""
+        server.part_size = 1000
+        server.extra_parts = 1
+        with pytest.raises(AIDPError, match="5 part URLs for 4 parts"):
+            await client.upload_file(str(video))
+        assert not server.completions
+
+    async def test_lut_uploaded_once(self, server, client, tmp_path):
+        """Test a batch sharing one LUT uploads it once"""
+        lut = tmp_path / "grade.cube"
+        lut.write_text("LUT_3D_SIZE 2\n")
+
+        jobs = await asyncio.gather(*(
+            client.submit_job(f"input-{i}", {"encoder": "h264_nvenc"}, lut_path=str(lut))
+            for i in range(10)
+        ))
+
+        assert len(jobs) == 10
+        assert [r["filename"] for r in server.upload_requests] == ["grade.cube"]
+        lut_ids = {job["config"]["lut_file_id"] for job in server.jobs.values()}
+        assert lut_ids == {"file-1"}
+
+
+class TestJobStatus:
+    """Test job status polling and events"""
+
+    async def test_status_revalidated_with_etag(self, server, client):
+        """Test unchanged status comes back as a 304 and reuses the cached body"""
+        job = await client.submit_job("input", {"encoder": "h264_nvenc"})
+
+        first = await client.get_job_status(job["job_id"])
+        second = await client.get_job_status(job["job_id"])
+
+        assert second == first == {"status": "processing", "progress": 50}
+        assert "If-None-Match" not in server.status_headers[0]
+        assert server.status_headers[1]["If-None-Match"] == '"processing"'
+
+    async def test_wait_uses_event_stream(self, server, client):
+        """Test completion is taken from the job event stream"""
+        server.events = True
+        job = await client.submit_job("input", {"encoder": "h264_nvenc"})
+
+        seen = []
+        result = await client.wait_for_job(job["job_id"], progress_callback=seen.append)
+
+        assert result["status"] == "completed"
+        assert [s["status"] for s in seen] == ["processing", "completed"]
+        assert not server.status_headers
+
+    async def test_wait_falls_back_to_polling(self, server, client):
+        """Test a 404 event endpoint falls back to polling and is not retried"""
+        for _ in range(2):
+            job = await client.submit_job("input", {"encoder": "h264_nvenc"})
+            result = await client.wait_for_job(job["job_id"], poll_interval=0.01)
+            assert result["status"] == "completed"
+
+        assert server.ws_attempts == 1
+        assert client._events_supported is False
+
+    async def test_wait_terminal_errors(self, server, client):
+        """Test failed and unknown jobs raise AIDPJobFailed, transient errors do not"""
+        client._events_supported = False
+        job = await client.submit_job("input", {"encoder": "h264_nvenc"})
+
+        server.jobs[job["job_id"]]["unavailable"] = True
+        with pytest.raises(AIDPError) as excinfo:
+            await client.wait_for_job(job["job_id"])
+        assert not isinstance(excinfo.value, AIDPJobFailed)
+
+        server.jobs[job["job_id"]]["error"] = "encoder crashed"
+        with pytest.raises(AIDPJobFailed, match="encoder crashed"):
+            await client.wait_for_job(job["job_id"])
+
+        with pytest.raises(AIDPJobFailed, match="not found"):
+            await client.wait_for_job("job-expired")
+
+
+class TestDownload:
+    """Test file downloads"""
+
+    async def test_ranged_download(self, server, client, tmp_path, monkeypatch):
+        """Test large files are fetched as parallel ranges sized by a GET probe"""
+        monkeypatch.setattr(aidp_client, "DOWNLOAD_RANGE_MIN_SIZE", 1000)
+        server.files["out"] = data = os.urandom(10_000)
+        output = tmp_path / "out.mp4"
+
+        await client.download_file("out", str(output))
+
+        assert output.read_bytes() == data
+        assert server.range_requests[0] == "bytes=0-0"
+        assert len(server.range_requests) == 1 + aidp_client.DOWNLOAD_RANGE_PARTS
+
+    async def test_download_without_ranges(self, server, client, tmp_path, monkeypatch):
+        """Test servers that ignore Range get a single stream"""
+        monkeypatch.setattr(aidp_client, "DOWNLOAD_RANGE_MIN_SIZE", 1000)
+        server.ranges = False
+        server.files["out"] = data = os.urandom(10_000)
+        output = tmp_path / "out.mp4"
+
+        await client.download_file("out", str(output))
+
+        assert output.read_bytes() == data
+
+    async def test_size_probe_connection_error(self, client):
+        """Test a failed size probe means a single-stream download"""
+        assert await client._ranged_download_size("http://127.0.0.1:1/get/out") is None
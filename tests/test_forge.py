@@ -0,0 +1,211 @@
+"""
+Tests for AIDP Video Forge batch skip, resume and resubmit logic
+"""
+
+import argparse
+import hashlib
+from pathlib import Path
+
+import pytest
+
+import forge
+from aidp_client import AIDPClient, AIDPError, AIDPJobFailed
+from state import STATE_DB_NAME, JobStore
+
+
+class StubAIDP:
+    """Stand-in for AIDPClient that records calls instead of using the network"""
+
+    hash_file = staticmethod(AIDPClient.hash_file)
+
+    def __init__(self):
+        self.uploads: list[str] = []
+        self.submissions: list[str] = []
+        self.waits: list[str] = []
+        self.luts: list = []
+        # Job IDs whose wait fails, as for a job that failed or expired on AIDP
+        self.failed_jobs: set[str] = set()
+        # Job IDs whose wait hits a transient error, such as a status check 5xx
+        self.unreachable_jobs: set[str] = set()
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    async def upload_file(self, file_path, file_hash=None):
+        self.uploads.append(file_path)
+        return {"file_id": f"file-{len(self.uploads)}"}
+
+    async def submit_job(self, input_file_id, preset, lut_path=None):
+        self.submissions.append(input_file_id)
+        self.luts.append(lut_path)
+        return {"job_id": f"job-{len(self.submissions)}"}
+
+    async def wait_for_job(self, job_id):
+        self.waits.append(job_id)
+        if job_id in self.failed_jobs:
+            raise AIDPJobFailed("Job failed: expired")
+        if job_id in self.unreachable_jobs:
+            raise AIDPError("Status check failed: 503")
+        return {"status": "completed", "output_file_id": f"out-{job_id}"}
+
+    async def download_file(self, file_id, output_path):
+        with open(output_path, "w") as f:
+            f.write(file_id)
+        return output_path
+
+
+@pytest.fixture
+def aidp(monkeypatch):
+    """StubAIDP patched in as forge's AIDPClient"""
+    stub = StubAIDP()
+    monkeypatch.setattr(forge, "AIDPClient", stub)
+    return stub
+
+
+@pytest.fixture
+def batch(tmp_path):
+    """Input directory with one video, and batch arguments for it"""
+    input_dir = tmp_path / "videos"
+    input_dir.mkdir()
+    video = input_dir / "clip.mp4"
+    video.write_bytes(b"video data")
+
+    args = argparse.Namespace(
+        input=str(input_dir),
+        output=str(tmp_path / "out"),
+        preset="default",
+        lut=None,
+        parallel=2,
+    )
+    return args, hashlib.sha256(b"video data").hexdigest()
+
+
+def job_store(args) -> JobStore:
+    return JobStore(f"{args.output}/{STATE_DB_NAME}")
+
+
+class TestBatchResume:
+    """Test batch runs skip, resume and resubmit from recorded state"""
+
+    async def test_first_run_submits(self, aidp, batch):
+        """Test a new video is uploaded, submitted and recorded as completed"""
+        args, file_hash = batch
+        assert await forge.batch_process(args) == 0
+
+        assert len(aidp.uploads) == 1
+        assert aidp.submissions == ["file-1"]
+        with job_store(args) as store:
+            assert store.get(file_hash)["status"] == "completed"
+
+    async def test_resume_skips_completed(self, aidp, batch):
+        """Test a resumed batch does not touch finished videos"""
+        args, _ = batch
+        await forge.batch_process(args)
+
+        assert await forge.batch_process(args, resume=True) == 0
+        assert len(aidp.uploads) == 1
+        assert aidp.submissions == ["file-1"]
+        assert aidp.waits == ["job-1"]
+
+    async def test_resume_waits_on_submitted_job(self, aidp, batch):
+        """Test a resumed batch picks up an in-flight job instead of resubmitting"""
+        args, file_hash = batch
+        output = f"{args.output}/clip_processed.mp4"
+        Path(args.output).mkdir()
+        with job_store(args) as store:
+            store.record_upload(file_hash, "file-old")
+            store.record_job(file_hash, "job-old", args.preset, output)
+
+        assert await forge.batch_process(args, resume=True) == 0
+        assert aidp.waits == ["job-old"]
+        assert not aidp.uploads and not aidp.submissions
+        with job_store(args) as store:
+            assert store.get(file_hash)["status"] == "completed"
+
+    async def test_resume_resubmits_failed_job(self, aidp, batch):
+        """Test a resumed job that failed on AIDP is resubmitted from the stored upload"""
+        args, file_hash = batch
+        output = f"{args.output}/clip_processed.mp4"
+        Path(args.output).mkdir()
+        with job_store(args) as store:
+            store.record_upload(file_hash, "file-old")
+            store.record_job(file_hash, "job-old", args.preset, output)
+        aidp.failed_jobs.add("job-old")
+
+        assert await forge.batch_process(args, resume=True) == 0
+        assert aidp.waits == ["job-old", "job-1"]
+        assert aidp.submissions == ["file-old"]
+        assert not aidp.uploads
+        with job_store(args) as store:
+            record = store.get(file_hash)
+            assert record["job_id"] == "job-1"
+            assert record["status"] == "completed"
+
+    async def test_resume_recovers_repeated_failures(self, aidp, batch):
+        """Test a resubmitted job that fails too is resubmitted on the next resume"""
+        args, file_hash = batch
+        await forge.batch_process(args)
+        with job_store(args) as store:
+            store.record_job(
+                file_hash, "job-old", args.preset, f"{args.output}/clip_processed.mp4"
+            )
+        aidp.failed_jobs.update({"job-old", "job-2"})
+
+        assert await forge.batch_process(args, resume=True) == 1
+        assert await forge.batch_process(args, resume=True) == 0
+        assert aidp.waits == ["job-1", "job-old", "job-2", "job-2", "job-3"]
+
+    async def test_resume_keeps_job_on_transient_error(self, aidp, batch):
+        """Test a resumed job is not resubmitted when its status can't be checked"""
+        args, file_hash = batch
+        output = f"{args.output}/clip_processed.mp4"
+        Path(args.output).mkdir()
+        with job_store(args) as store:
+            store.record_upload(file_hash, "file-old")
+            store.record_job(file_hash, "job-old", args.preset, output)
+        aidp.unreachable_jobs.add("job-old")
+
+        assert await forge.batch_process(args, resume=True) == 1
+        assert not aidp.submissions
+        with job_store(args) as store:
+            record = store.get(file_hash)
+            assert record["job_id"] == "job-old"
+            assert record["status"] == "submitted"
+
+    async def test_resume_resubmits_with_new_lut(self, aidp, batch, tmp_path):
+        """Test a resumed batch with a different LUT regrades finished videos"""
+        args, file_hash = batch
+        lut = tmp_path / "grade.cube"
+        lut.write_text("LUT_3D_SIZE 2\n")
+        await forge.batch_process(args)
+
+        args.lut = str(lut)
+        assert await forge.batch_process(args, resume=True) == 0
+        assert await forge.batch_process(args, resume=True) == 0
+        assert aidp.submissions == ["file-1", "file-1"]
+        assert aidp.luts == [None, str(lut)]
+        with job_store(args) as store:
+            assert store.get(file_hash)["lut"] == forge.lut_key(str(lut))
+
+
+class TestBatchLut:
+    """Test --lut is checked before any video is processed"""
+
+    async def test_missing_preferred_lut(self, aidp, batch, tmp_path, monkeypatch, capsys):
+        """Test a preferred LUT missing from LUTS_DIR fails the batch up front"""
+        monkeypatch.setattr(
+            forge, "preferred_lut_path", lambda preset: str(tmp_path / "missing.cube")
+        )
+        args, _ = batch
+        args.preset = "cinematic"
+        args.lut = forge.PREFERRED_LUT
+
+        assert await forge.batch_process(args) == 1
+        assert "LUT file not found" in capsys.readouterr().out
+        assert not aidp.uploads and not aidp.submissions
@@ -4,28 +4,33 @@ Tests for AIDP Video Forge GPU Pipeline
 
 import pytest
 import asyncio
-from pathlib import Path
+import copy
+import pickle
+import subprocess
 import sys
+import types
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from gpu_pipeline import GPUPipeline
-from presets import PRESETS, get_preset, list_presets
+import gpu_pipeline
+from gpu_pipeline import GPUPipeline, _parse_duration, _probe_ffmpeg
+import presets
+from presets import (
+    PRESETS, EncoderFamily, _compile_filter_chain, _probe_gpu, compiled_preset, cpu_fallback,
+    encoder_family, find_presets, get_preset, list_presets, preferred_lut_path,
+    presets_fitting, runnable_presets
+)
 
 
 class TestGPUPipeline:
     """Test GPU pipeline functionality"""
 
-    def test_pipeline_initialization(self):
+    def test_pipeline_initialization(self, pipeline):
         """Test pipeline can be initialized"""
-        pipeline = GPUPipeline()
         assert pipeline is not None
         assert hasattr(pipeline, 'has_nvenc')
         assert hasattr(pipeline, 'has_cuda')
 
-    def test_build_gpu_command_basic(self):
+    def test_build_gpu_command_basic(self, pipeline):
         """Test basic FFmpeg command generation"""
-        pipeline = GPUPipeline()
         cmd = pipeline.build_gpu_command(
             input_path="input.mp4",
             output_path="output.mp4",
@@ -36,10 +41,9 @@ class TestGPUPipeline:
         assert "input.mp4" in cmd
         assert "output.mp4" in cmd
 
-    def test_build_gpu_command_with_nvenc(self):
+    def test_build_gpu_command_with_nvenc(self, pipeline, monkeypatch):
         """Test NVENC encoder is used when available"""
-        pipeline = GPUPipeline()
-        pipeline.has_nvenc = True  # Force NVENC available
+        monkeypatch.setattr(pipeline, "has_nvenc", True)  # Force NVENC available
 
         cmd = pipeline.build_gpu_command(
             input_path="input.mp4",
@@ -51,9 +55,33 @@ class TestGPUPipeline:
         cmd_str = " ".join(cmd)
         assert "h264_nvenc" in cmd_str or "libx264" in cmd_str
 
-    def test_build_gpu_command_with_lut(self):
+    def test_argv_template_reused(self, pipeline, monkeypatch):
+        """Test commands are filled in from a cached per-preset argv template"""
+        first = pipeline.build_gpu_command("a.mp4", "a_out.mp4", PRESETS["broadcast"])
+        second = pipeline.build_gpu_command("b.mp4", "b_out.mp4", PRESETS["broadcast"])
+        assert first[first.index("-i") + 1] == "a.mp4" and first[-1] == "a_out.mp4"
+        assert second[second.index("-i") + 1] == "b.mp4" and second[-1] == "b_out.mp4"
+        assert "{I}" not in second and "{O}" not in second
+
+        # Changing capabilities must not reuse a stale template
+        monkeypatch.setattr(pipeline, "has_cuda", not pipeline.has_cuda)
+        third = pipeline.build_gpu_command("b.mp4", "b_out.mp4", PRESETS["broadcast"])
+        assert third != second
+
+    def test_nvenc_speed_tuning(self, pipeline, monkeypatch):
+        """Test quality presets get lookahead/AQ and fast presets low-latency tuning"""
+        monkeypatch.setattr(pipeline, "has_nvenc", True)
+
+        quality = pipeline.build_gpu_command("in.mp4", "out.mp4", PRESETS["cinematic"])
+        assert "-rc-lookahead" in quality
+        assert "-temporal-aq" in quality
+
+        fast = pipeline.build_gpu_command("in.mp4", "out.mp4", PRESETS["fast_preview"])
+        assert fast[fast.index("-tune") + 1] == "ll"
+        assert "-rc-lookahead" not in fast
+
+    def test_build_gpu_command_with_lut(self, pipeline):
         """Test LUT filter is added when LUT path provided"""
-        pipeline = GPUPipeline()
         cmd = pipeline.build_gpu_command(
             input_path="input.mp4",
             output_path="output.mp4",
@@ -64,6 +92,95 @@ class TestGPUPipeline:
         cmd_str = " ".join(cmd)
         assert "lut3d" in cmd_str
 
+    def test_preferred_lut_filter(self, pipeline, monkeypatch):
+        """Test presets precompute their preferred LUT path and filter"""
+        monkeypatch.setattr(pipeline, "has_cuda", False)
+        preset = PRESETS["cinematic"]
+        lut_path = preferred_lut_path(preset)
+        assert lut_path.endswith("Cinematic_Teal_Orange.cube")
+        assert preferred_lut_path(PRESETS["default"]) is None
+
+        cmd = pipeline.build_gpu_command("in.mp4", "out.mp4", preset, lut_path=lut_path)
+        assert f"lut3d='{lut_path}'" in cmd[cmd.index("-vf") + 1]
+
+        custom = dict(preset)
+        custom["preferred_lut"] = "Film_Kodak.cube"
+        assert preferred_lut_path(custom).endswith("Film_Kodak.cube")
+
+    def test_filter_chain_libplacebo_keeps_frames_on_gpu(self, pipeline, monkeypatch):
+        """Test LUT + eq use one libplacebo pass instead of hwdownload"""
+        monkeypatch.setattr(pipeline, "has_cuda", True)
+        monkeypatch.setattr(pipeline, "has_libplacebo", True)
+
+        filters = pipeline._build_filter_chain(
+            {"eq": {"contrast": 1.1, "saturation": 1.2}},
+            lut_path="test.cube"
+        )
+
+        assert filters == (
+            "hwupload=derive_device=vulkan,"
+            "libplacebo=lut='test.cube':contrast=1.1:saturation=1.2,"
+            "hwupload=derive_device=cuda"
+        )
+
+    def test_filter_chain_libplacebo_skipped_before_cpu_filters(self, pipeline, monkeypatch):
+        """Test a CPU-only filter keeps the LUT and eq on the single CPU download"""
+        monkeypatch.setattr(pipeline, "has_cuda", True)
+        monkeypatch.setattr(pipeline, "has_libplacebo", True)
+
+        filters = pipeline._build_filter_chain(
+            {"eq": {"contrast": 1.1}, "grain": 8}, lut_path="test.cube"
+        )
+        assert "libplacebo" not in filters
+        assert filters.count("hwdownload") == 1
+        assert filters.index("hwdownload") < filters.index("lut3d") < filters.index("eq=")
+
+        # Every built-in preset with eq also has a CPU-only filter
+        for name, preset in PRESETS.items():
+            if preset.get("eq"):
+                assert "libplacebo" not in pipeline._build_filter_chain(preset), name
+
+    @pytest.mark.parametrize("vulkan_returncode, expected", [(0, True), (1, False)])
+    def test_probe_ffmpeg_vulkan(self, monkeypatch, vulkan_returncode, expected):
+        """Test libplacebo is only used when a Vulkan device can be derived from CUDA"""
+        class FakePopen:
+            def __init__(self, args, **kwargs):
+                self.output = "h264_nvenc" if "-encoders" in args else "scale_cuda libplacebo"
+
+            def communicate(self):
+                return self.output, ""
+
+        vulkan_probes = []
+
+        def run(args, **kwargs):
+            vulkan_probes.append(args)
+            return subprocess.CompletedProcess(args, vulkan_returncode)
+
+        monkeypatch.setattr(gpu_pipeline.subprocess, "Popen", FakePopen)
+        monkeypatch.setattr(gpu_pipeline.subprocess, "run", run)
+
+        assert _probe_ffmpeg.__wrapped__("ffmpeg") == (True, True, expected)
+        assert "vulkan=vk@cu" in vulkan_probes[0]
+
+    def test_filter_chain_cpu_color_correction(self, pipeline, monkeypatch):
+        """Test eq options form a single filter without libplacebo"""
+        monkeypatch.setattr(pipeline, "has_cuda", True)
+        monkeypatch.setattr(pipeline, "has_libplacebo", False)
+
+        filters = pipeline._build_filter_chain(
+            {"eq": {"contrast": 1.1, "saturation": 1.2}},
+            lut_path="test.cube"
+        )
+
+        assert "hwdownload,format=nv12,lut3d='test.cube'" in filters
+        assert "eq=contrast=1.1:saturation=1.2" in filters
+
+    def test_parse_duration_from_ffmpeg_log(self):
+        """Test input duration is read from ffmpeg's stderr"""
+        log = "Input #0, mov,mp4, from 'in.mp4':\n  Duration: 01:02:03.50, start: 0.000000"
+        assert _parse_duration(log) == 3723.5
+        assert _parse_duration("no duration here") is None
+
     def test_cuda_filter_mapping(self):
         """Test CUDA filter equivalents are defined"""
         assert "scale" in GPUPipeline.CUDA_FILTERS
@@ -76,27 +193,30 @@ class TestGPUPipeline:
         assert "best" in GPUPipeline.NVENC_PRESETS
         assert GPUPipeline.NVENC_PRESETS["fastest"] == "p1"
         assert GPUPipeline.NVENC_PRESETS["best"] == "p7"
+        fast_preview = compiled_preset(PRESETS["fast_preview"]).argv
+        assert fast_preview[fast_preview.index("-preset") + 1] == "p1"
+        cinematic = compiled_preset(PRESETS["cinematic"]).argv
+        assert cinematic[cinematic.index("-preset") + 1] == "p6"
 
 
 class TestPresets:
     """Test processing presets"""
 
-    def test_all_presets_exist(self):
+    @pytest.mark.parametrize("preset_name", [
+        "default", "cinematic", "broadcast", "social_vertical",
+        "hdr_to_sdr", "hevc_master", "fast_preview", "youtube",
+        "netflix", "vintage_film", "documentary", "action"
+    ])
+    def test_all_presets_exist(self, preset_name):
         """Test all expected presets are defined"""
-        expected = [
-            "default", "cinematic", "broadcast", "social_vertical",
-            "hdr_to_sdr", "hevc_master", "fast_preview", "youtube",
-            "netflix", "vintage_film", "documentary", "action"
-        ]
-        for preset_name in expected:
-            assert preset_name in PRESETS, f"Missing preset: {preset_name}"
-
-    def test_preset_has_required_fields(self):
+        assert preset_name in PRESETS, f"Missing preset: {preset_name}"
+
+    @pytest.mark.parametrize("name", list(PRESETS))
+    def test_preset_has_required_fields(self, name):
         """Test presets have required fields"""
         required_fields = ["description", "encoder", "min_vram_gb"]
-        for name, preset in PRESETS.items():
-            for field in required_fields:
-                assert field in preset, f"Preset {name} missing field: {field}"
+        for field in required_fields:
+            assert field in PRESETS[name], f"Preset {name} missing field: {field}"
 
     def test_get_preset(self):
         """Test get_preset function"""
@@ -115,6 +235,213 @@ class TestPresets:
         assert "default" in presets
         assert "cinematic" in presets
 
+    def test_encoder_family(self):
+        """Test presets are tagged with their encoder family"""
+        assert compiled_preset(PRESETS["default"]).encoder_family is EncoderFamily.H264_NVENC
+        assert compiled_preset(PRESETS["netflix"]).encoder_family is EncoderFamily.HEVC_NVENC
+        assert encoder_family("libx265") is EncoderFamily.LIBX265
+        assert encoder_family("future_nvenc").is_nvenc
+        assert not encoder_family("libvpx-vp9").is_nvenc
+
+    def test_presets_fitting(self):
+        """Test presets are filtered by available VRAM"""
+        assert "netflix" not in presets_fitting(8)
+        assert "youtube" in presets_fitting(8)
+        assert presets_fitting(2) == ["fast_preview"]
+        assert len(presets_fitting(24)) == len(PRESETS)
+
+    def test_find_presets(self):
+        """Test presets can be found by encoder and VRAM requirement"""
+        assert find_presets(encoder="hevc_nvenc") == ["hevc_master", "netflix"]
+        assert find_presets(encoder="hevc_nvenc", max_vram=8) == ["hevc_master"]
+        assert sorted(find_presets(max_vram=8)) == sorted(presets_fitting(8))
+        assert find_presets() == list_presets()
+
+    def test_runnable_presets(self, monkeypatch):
+        """Test presets are matched against the local GPU's capability and VRAM"""
+        monkeypatch.setattr(presets, "_probe_gpu", lambda: (7.0, 8.0))
+        runnable = runnable_presets()
+        assert "youtube" in runnable
+        assert "hdr_to_sdr" not in runnable  # needs compute capability 7.5
+        assert "netflix" not in runnable  # needs 10 GB
+
+        monkeypatch.setattr(presets, "_probe_gpu", lambda: None)
+        assert runnable_presets() == []
+        assert presets.is_runnable(PRESETS["default"]) is None
+
+    @pytest.mark.parametrize("stdout, expected", [
+        ("8.6, 8188\n", (8.6, 8.0)),  # 8 GB card reporting just under 8192 MiB
+        ("7.5, 24564\n", (7.5, 24.0)),
+    ])
+    def test_probe_gpu_smi(self, monkeypatch, stdout, expected):
+        """Test nvidia-smi output is parsed with VRAM rounded to whole GB"""
+        monkeypatch.setitem(sys.modules, "pynvml", None)
+        monkeypatch.setattr(
+            presets.subprocess, "run",
+            lambda *args, **kwargs: subprocess.CompletedProcess(args, 0, stdout, "")
+        )
+        assert _probe_gpu.__wrapped__() == expected
+
+    def test_probe_gpu_failure(self, monkeypatch):
+        """Test a missing or too old nvidia-smi is reported as unknown, not as no GPU"""
+        monkeypatch.setitem(sys.modules, "pynvml", None)
+
+        def missing(*args, **kwargs):
+            raise FileNotFoundError("nvidia-smi")
+
+        monkeypatch.setattr(presets.subprocess, "run", missing)
+        assert _probe_gpu.__wrapped__() is None
+
+        monkeypatch.setattr(
+            presets.subprocess, "run",
+            lambda *args, **kwargs: subprocess.CompletedProcess(
+                args, 2, "", "Field \"compute_cap\" is not a valid field to query."
+            )
+        )
+        assert _probe_gpu.__wrapped__() is None
+
+    def test_probe_gpu_prefers_nvml(self, monkeypatch):
+        """Test the probe uses NVML without spawning nvidia-smi when pynvml is present"""
+        calls = []
+
+        class NVMLError(Exception):
+            pass
+
+        fake_pynvml = types.SimpleNamespace(
+            NVMLError=NVMLError,
+            nvmlInit=lambda: calls.append("init"),
+            nvmlShutdown=lambda: calls.append("shutdown"),
+            nvmlDeviceGetHandleByIndex=lambda index: "gpu0",
+            nvmlDeviceGetCudaComputeCapability=lambda handle: (8, 9),
+            nvmlDeviceGetMemoryInfo=lambda handle: types.SimpleNamespace(
+                total=8188 * 1024 * 1024
+            ),
+        )
+        monkeypatch.setitem(sys.modules, "pynvml", fake_pynvml)
+
+        def no_smi(*args, **kwargs):
+            raise AssertionError("nvidia-smi spawned")
+
+        monkeypatch.setattr(presets.subprocess, "run", no_smi)
+        assert _probe_gpu.__wrapped__() == (8.9, 8.0)
+        assert calls == ["init", "shutdown"]
+
+    def test_cpu_fallback(self):
+        """Test the CPU fallback swaps NVENC for the matching software encoder"""
+        assert cpu_fallback(PRESETS["default"])["encoder"] == "libx264"
+        fallback = cpu_fallback(PRESETS["netflix"])
+        assert fallback["encoder"] == "libx265"
+        assert compiled_preset(fallback) is None
+        assert fallback["hwaccel"] is False and fallback["use_cuda"] is False
+        assert _compile_filter_chain(fallback) == compiled_preset(PRESETS["netflix"]).vf_cpu
+
+    def test_preset_filter_flags(self):
+        """Test presets are flagged with whether they need a filter chain"""
+        assert compiled_preset(PRESETS["default"]).has_filters is False
+        assert compiled_preset(PRESETS["hevc_master"]).has_filters is False
+        assert compiled_preset(PRESETS["cinematic"]).has_filters is True
+        assert compiled_preset(PRESETS["hdr_to_sdr"]).has_filters is True
+
+    def test_customised_copy_filters(self, pipeline):
+        """Test filters added to a copy of a filterless preset are built"""
+        custom = dict(PRESETS["default"])
+        custom["scale"] = (640, 360)
+        custom["fps"] = 30
+
+        cmd = pipeline.build_gpu_command("in.mp4", "out.mp4", custom)
+        vf = cmd[cmd.index("-vf") + 1]
+        assert "scale=640:360" in vf or "scale_cuda=640:360" in vf
+        assert "fps=30" in vf
+
+    def test_presets_cuda_filtergraph(self):
+        """Test CUDA filtergraphs keep scaling on the GPU and download once"""
+        broadcast = compiled_preset(PRESETS["broadcast"]).vf_cuda
+        assert broadcast.startswith("scale_cuda=1920:1080")
+        assert "hwdownload" not in broadcast
+
+        cinematic = compiled_preset(PRESETS["cinematic"]).vf_cuda
+        assert cinematic.count("hwdownload") == 1
+        assert cinematic.index("hwdownload") < cinematic.index("eq=")
+
+    def test_presets_read_only(self):
+        """Test shared presets cannot be mutated"""
+        with pytest.raises(TypeError):
+            PRESETS["default"]["cq"] = 30
+        with pytest.raises(TypeError):
+            PRESETS["custom"] = {}
+        custom = dict(PRESETS["default"])
+        custom["cq"] = 30
+        assert PRESETS["default"]["cq"] == 23
+
+    def test_presets_pickle_by_name(self):
+        """Test registered presets pickle by reference and copy as themselves"""
+        preset = PRESETS["cinematic"]
+        data = pickle.dumps(preset)
+        assert b"Film-like" not in data
+        assert pickle.loads(data) is preset
+        assert copy.deepcopy(preset) is preset
+
+        fallback = cpu_fallback(preset)
+        assert pickle.loads(pickle.dumps(fallback)) == fallback
+
+    def test_presets_precompiled(self, pipeline, monkeypatch):
+        """Test presets carry precompiled argv and filtergraph used by the pipeline"""
+        monkeypatch.setattr(pipeline, "has_cuda", False)
+        for name, preset in PRESETS.items():
+            assert compiled_preset(preset).argv[:2] == ("-c:v", preset["encoder"]), name
+            cmd = pipeline.build_gpu_command("in.mp4", "out.mp4", preset)
+            vf_cpu = compiled_preset(preset).vf_cpu
+            if vf_cpu:
+                assert cmd[cmd.index("-vf") + 1] == vf_cpu, name
+
+    def test_customised_copy_not_precompiled(self, pipeline):
+        """Test edits to a copied preset are honoured instead of its precompiled argv"""
+        custom = dict(PRESETS["default"])
+        custom["cq"] = 30
+        assert compiled_preset(custom) is None
+
+        cmd = pipeline.build_gpu_command("in.mp4", "out.mp4", custom)
+        assert cmd[cmd.index("-cq") + 1] == "30"
+
+    @pytest.mark.parametrize("has_cuda", [False, True])
+    def test_customised_copy_scale_and_speed(self, pipeline, monkeypatch, has_cuda):
+        """Test a copied preset's scale and speed are not taken from the original"""
+        monkeypatch.setattr(pipeline, "has_cuda", has_cuda)
+        custom = dict(PRESETS["broadcast"])
+        custom["scale"] = (1280, 720)
+        custom["speed"] = "fastest"
+
+        cmd = pipeline.build_gpu_command("in.mp4", "out.mp4", custom)
+        vf = cmd[cmd.index("-vf") + 1]
+        assert "1280:720" in vf and "1920:1080" not in vf
+        assert cmd[cmd.index("-preset") + 1] == "p1"
+
+    def test_customised_copy_encoder(self, pipeline, monkeypatch):
+        """Test a copy switched to a CPU encoder drops the NVENC tuning"""
+        monkeypatch.setattr(presets, "_probe_gpu", lambda: (8.9, 24.0))
+        assert "-b_ref_mode" in pipeline._gpu_tuning_args(PRESETS["cinematic"])
+
+        custom = dict(PRESETS["cinematic"])
+        custom["encoder"] = "libx264"
+        cmd = pipeline.build_gpu_command("in.mp4", "out.mp4", custom)
+        assert "-b_ref_mode" not in cmd
+
+    def test_custom_preset_not_cached(self, pipeline):
+        """Test custom dicts are rebuilt each time and never cached"""
+        custom = {"encoder": "libx264", "crf": 20}
+        cmd = pipeline.build_gpu_command("in.mp4", "out.mp4", custom)
+        assert cmd[cmd.index("-crf") + 1] == "20"
+
+        custom["crf"] = 30
+        cmd = pipeline.build_gpu_command("in.mp4", "out.mp4", custom)
+        assert cmd[cmd.index("-crf") + 1] == "30"
+
+        cached = len(pipeline._compiled_presets)
+        for _ in range(100):
+            pipeline.build_gpu_command("in.mp4", "out.mp4", dict(custom))
+            pipeline._build_filter_chain({"scale": (640, 360)})
+        assert len(pipeline._compiled_presets) == cached
+
     def test_cinematic_preset(self):
         """Test cinematic preset configuration"""
         preset = PRESETS["cinematic"]
@@ -128,6 +455,7 @@ class TestPresets:
         preset = PRESETS["broadcast"]
         assert preset["rate_control"] == "cbr"
         assert preset["scale"] == (1920, 1080)
+        assert compiled_preset(preset).scale_x_str == "1920x1080"
 
     def test_youtube_preset(self):
         """Test YouTube preset configuration"""
@@ -139,25 +467,46 @@ class TestPresets:
 class TestGPUInfo:
     """Test GPU detection"""
 
-    def test_get_gpu_info(self):
+    def test_get_gpu_info(self, pipeline):
         """Test GPU info retrieval"""
-        pipeline = GPUPipeline()
         info = pipeline.get_gpu_info()
 
         assert "name" in info
         assert "nvenc_available" in info
         assert "cuda_filters_available" in info
 
+    def test_nvml_initialised_once(self, monkeypatch):
+        """Test a failed NVML handle lookup does not initialise NVML again"""
+        calls = []
+
+        class NVMLError(Exception):
+            pass
+
+        def no_device(index):
+            raise NVMLError("no device")
+
+        fake_pynvml = types.SimpleNamespace(
+            NVMLError=NVMLError,
+            nvmlInit=lambda: calls.append("init"),
+            nvmlShutdown=lambda: calls.append("shutdown"),
+            nvmlDeviceGetHandleByIndex=no_device,
+        )
+        monkeypatch.setitem(sys.modules, "pynvml", fake_pynvml)
+
+        pipeline = GPUPipeline()
+        assert pipeline._nvml_gpu_info() is None
+        assert pipeline._nvml_gpu_info() is None
+        assert calls == ["init"]
+        pipeline.__del__()
+        assert calls == ["init", "shutdown"]
+
 
 # Async tests
 class TestAsyncPipeline:
     """Test async pipeline operations"""
 
-    @pytest.mark.asyncio
-    async def test_process_local_missing_file(self):
+    async def test_process_local_missing_file(self, pipeline):
         """Test local processing with missing file"""
-        pipeline = GPUPipeline()
-
         result = await pipeline.process_local(
             input_path="nonexistent.mp4",
             output_path="output.mp4",
@@ -167,6 +516,30 @@ class TestAsyncPipeline:
         assert result["success"] is False
         assert "error" in result
 
+    @pytest.mark.parametrize("has_nvenc, gpu, encoder", [
+        (True, None, "h264_nvenc"),  # probe failed: trust FFmpeg's NVENC
+        (True, (8.6, 8.0), "h264_nvenc"),
+        (True, (8.6, 4.0), "libx264"),  # probed GPU too small for youtube
+        (False, None, "libx264"),  # no NVENC in FFmpeg
+    ])
+    async def test_process_local_cpu_fallback(
+        self, pipeline, monkeypatch, has_nvenc, gpu, encoder
+    ):
+        """Test presets fall back to CPU only when NVENC is missing or the GPU is too small"""
+        built = []
+
+        def build_gpu_command(input_path, output_path, preset, lut_path=None):
+            built.append(preset)
+            raise RuntimeError("stop before running ffmpeg")
+
+        monkeypatch.setattr(pipeline, "has_nvenc", has_nvenc)
+        monkeypatch.setattr(pipeline, "build_gpu_command", build_gpu_command)
+        monkeypatch.setattr(presets, "_probe_gpu", lambda: gpu)
+
+        with pytest.raises(RuntimeError):
+            await pipeline.process_local("in.mp4", "out.mp4", PRESETS["youtube"])
+        assert built[0]["encoder"] == encoder
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,63 @@
+"""
+Tests for AIDP Video Forge batch state tracking
+"""
+
+import sqlite3
+
+import pytest
+
+from state import JobStore
+
+
+class TestJobStore:
+    """Test persistent batch job state"""
+
+    def test_unknown_input(self, tmp_path):
+        """Test lookups for unseen inputs return None"""
+        with JobStore(str(tmp_path / "state.db")) as store:
+            assert store.get("abc") is None
+
+    def test_job_lifecycle(self, tmp_path):
+        """Test upload, submit and completion are recorded"""
+        with JobStore(str(tmp_path / "state.db")) as store:
+            store.record_upload("abc", "file-1")
+            assert store.get("abc")["status"] == "uploaded"
+
+            store.record_job("abc", "job-1", "cinematic", "out.mp4")
+            record = store.get("abc")
+            assert record["file_id"] == "file-1"
+            assert record["job_id"] == "job-1"
+            assert record["status"] == "submitted"
+
+            store.mark_completed("abc")
+            assert store.get("abc")["status"] == "completed"
+            assert store.get("abc")["completed_at"] is not None
+
+    def test_state_persists(self, tmp_path):
+        """Test state survives reopening the database"""
+        path = str(tmp_path / "state.db")
+        with JobStore(path) as store:
+            store.record_upload("abc", "file-1")
+
+        with JobStore(path) as store:
+            assert store.get("abc")["file_id"] == "file-1"
+
+    def test_lut_recorded(self, tmp_path):
+        """Test a job's LUT is recorded, including in databases created without it"""
+        path = str(tmp_path / "state.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE jobs(input_hash TEXT PRIMARY KEY, file_id TEXT, job_id TEXT,"
+            " preset TEXT, output TEXT, status TEXT, completed_at INTEGER)"
+        )
+        conn.close()
+
+        with JobStore(path) as store:
+            store.record_upload("abc", "file-1")
+            assert store.get("abc")["lut"] is None
+            store.record_job("abc", "job-1", "cinematic", "out.mp4", "grade.cube:1:2")
+            assert store.get("abc")["lut"] == "grade.cube:1:2"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])